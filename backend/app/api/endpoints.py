@@ -1,40 +1,79 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
-import requests
+from fastapi import APIRouter, HTTPException, Query, Depends, BackgroundTasks, Header, Response
+from fastapi.responses import StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from typing import Optional, Tuple
+import httpx
+import asyncio
 from app.core.config import settings
 from app.models.schemas import (
     Game, ParsedRequirements, UserRegister, UserLogin, UserResponse,
-    FavoriteGame, FavoriteResponse, CompareRequest, CompareResponse
+    FavoriteGame, FavoriteResponse, CompareRequest, CompareResponse,
+    RigProfile, RigProfileResponse
 )
-from app.core.parser import parse_requirements
 from app.services.rawg_service import rawg_service
-from app.core import database, auth, comparator
+from app.services import game_service, compat_service
+from app.core import database, auth, comparator, catalog, cache, rankings, http_cache, search_cache
 import json
-import redis
+import hashlib
 
 router = APIRouter()
 
-# Initialize Redis
-try:
-    r = redis.from_url(settings.REDIS_URL, decode_responses=True)
-except Exception as e:
-    print(f"Warning: Redis connection failed: {e}")
-    r = None
+GAME_CACHE_TTL = 3600
+COMPARE_CACHE_TTL = 3600
+STREAM_REQUIREMENT_FIELDS = ("parsed_requirements_min", "parsed_requirements_rec", "file_size")
+BATCH_MAX_IDS = 40
 
-RAWG_BASE_URL = "https://api.rawg.io/api"
+def _search_response(normalized: str, suggestions: list, if_none_match: Optional[str]) -> Response:
+    """Search results with validators; the body and ETag are computed once, when cached."""
+    if normalized:
+        body, etag = search_cache.put(normalized, suggestions)
+    else:
+        body, etag = search_cache.render(suggestions)
+    return _cached_search_response(body, etag, if_none_match)
+
+def _cached_search_response(body: str, etag: str, if_none_match: Optional[str]) -> Response:
+    if http_cache.etag_matches(if_none_match, etag):
+        return http_cache.not_modified(etag, http_cache.SEARCH_CACHE_CONTROL)
+    return http_cache.json_response(body, etag, http_cache.SEARCH_CACHE_CONTROL)
 
 @router.get("/search")
-async def search_games(query: str = Query(..., min_length=1)):
+async def search_games(query: str = Query(..., min_length=1), if_none_match: Optional[str] = Header(None)):
     """
     Search for games with autocomplete suggestions.
     """
     if not query:
         return {"results": []}
     
+    # Repeated queries (and extensions of warm popular prefixes) are answered in-process
+    normalized = search_cache.normalize(query)
+    if normalized:
+        search_cache.record(normalized)
+        cached = search_cache.get(normalized, limit=5)
+        if cached is not None:
+            return _cached_search_response(*cached, if_none_match)
+    
+    # Answer from the local catalog first
+    try:
+        suggestions = catalog.search(query, limit=5)
+    except Exception as e:
+        print(f"Catalog search failed: {e}")
+        suggestions = []
+    if len(suggestions) >= settings.CATALOG_MIN_HITS:
+        return _search_response(normalized, suggestions, if_none_match)
+    
+    # Too few local hits: ask RAWG and keep what it returns for next time
     data = await rawg_service.search_games(query, page_size=5)
+    results = data.get("results", [])
+    try:
+        catalog.upsert_games(results)
+    except Exception as e:
+        print(f"Catalog ingestion failed: {e}")
     
     # Simplify the response for autocomplete
-    suggestions = []
-    for game in data.get("results", []):
+    seen = {s["id"] for s in suggestions}
+    for game in results:
+        if game.get("id") in seen or len(suggestions) >= 5:
+            continue
         suggestions.append({
             "id": game.get("id"),
             "name": game.get("name"),
@@ -44,181 +83,28 @@ async def search_games(query: str = Query(..., min_length=1)):
             "released": game.get("released")
         })
     
-    return {"results": suggestions}
+    return _search_response(normalized, suggestions, if_none_match)
 
-@router.get("/game/{game_name}", response_model=Game)
-async def get_game_details(game_name: str):
+async def _fetch_game_data_by_name(game_name: str) -> dict:
     """
-    Fetch game details from RAWG, parse system requirements, and return aggregated data.
+    Search RAWG for a game name and fetch its detail payload, mapping upstream failures to HTTP errors.
     """
-    if not settings.RAWG_API_KEY:
-        raise HTTPException(status_code=500, detail="RAWG API Key not configured")
-
-    # Check cache
-    cache_key = f"game:{game_name}"
-    if r:
-        try:
-            cached_data = r.get(cache_key)
-            if cached_data:
-                return json.loads(cached_data)
-        except Exception as e:
-            print(f"Redis cache read failed: {e}")
-
-    # Fetch from RAWG
-    # First search for the game to get the ID/slug
-    search_url = f"{RAWG_BASE_URL}/games"
-    params = {
-        "key": settings.RAWG_API_KEY,
-        "search": game_name,
-        "page_size": 1
-    }
-    
     try:
+        # First search for the game to get the ID/slug
         print(f"Searching for game: {game_name}")
-        response = requests.get(search_url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        print(f"Search response received, results count: {len(data.get('results', []))}")
-        
-        if not data.get("results"):
+        game_slug = await game_service.find_game_slug(game_name)
+        if not game_slug:
             raise HTTPException(status_code=404, detail="Game not found")
-            
-        game_slug = data["results"][0]["slug"]
         print(f"Found game slug: {game_slug}")
-        
-        # Get detailed info
-        detail_url = f"{RAWG_BASE_URL}/games/{game_slug}"
-        print(f"Fetching game details from: {detail_url}")
-        detail_response = requests.get(detail_url, params={"key": settings.RAWG_API_KEY, "language": "por"}, timeout=10)
-        detail_response.raise_for_status()
-        game_data = detail_response.json()
-        print(f"Game details received for: {game_data.get('name')}")
-        
-        # Parse requirements
-        platforms = game_data.get("platforms", [])
-        pc_requirements = {}
-        
-        for p in platforms:
-            if p.get("platform", {}).get("slug") == "pc":
-                pc_requirements = p.get("requirements", {})
-                break
-        
-        print(f"PC requirements found: {bool(pc_requirements)}")
-        parsed_min = parse_requirements(pc_requirements.get("minimum", ""))
-        parsed_rec = parse_requirements(pc_requirements.get("recommended", ""))
-        
-        # Construct response
-        game_obj = Game(
-            id=game_data["id"],
-            name=game_data["name"],
-            description_raw=game_data.get("description_raw"),
-            released=game_data.get("released"),
-            background_image=game_data.get("background_image"),
-            website=game_data.get("website"),
-            rating=game_data.get("rating"),
-            metacritic=game_data.get("metacritic"),
-            playtime=game_data.get("playtime"),
-            platforms=game_data.get("platforms"),
-            genres=game_data.get("genres"),
-            developers=game_data.get("developers"),
-            publishers=game_data.get("publishers"),
-            parsed_requirements_min=parsed_min,
-            parsed_requirements_rec=parsed_rec,
-            file_size=parsed_min.storage if parsed_min.storage else parsed_rec.storage,
-            similar_games=[]
-        )
-
-        # Fetch similar games
-        game_obj.similar_games = []  # Initialize empty list
-        try:
-            # Try the suggested endpoint first
-            suggested_url = f"{RAWG_BASE_URL}/games/{game_data['id']}/suggested"
-            print(f"Fetching similar games from: {suggested_url}")
-            suggested_response = requests.get(suggested_url, params={"key": settings.RAWG_API_KEY, "page_size": 2}, timeout=10)
-            print(f"Similar games response status: {suggested_response.status_code}")
-            
-            if suggested_response.status_code == 200:
-                suggested_data = suggested_response.json()
-                results = suggested_data.get("results", [])
-                print(f"Similar games from suggested endpoint: {len(results)}")
-                
-                # If suggested endpoint returns games, use them
-                if results:
-                    game_obj.similar_games = [
-                        {
-                            "id": g.get("id"),
-                            "name": g.get("name"),
-                            "background_image": g.get("background_image"),
-                            "rating": g.get("rating"),
-                            "genres": g.get("genres", [])[:1]
-                        }
-                        for g in results[:2]
-                    ]
-                    print(f"Similar games fetched from suggested: {len(game_obj.similar_games)}")
-            
-            # Fallback: If suggested endpoint fails or returns empty, search by genre
-            if not game_obj.similar_games and game_data.get("genres"):
-                print("Suggested endpoint empty, trying genre-based search...")
-                # Get all genre IDs from the current game
-                genre_ids = [str(g.get("id")) for g in game_data.get("genres", [])]
-                
-                if genre_ids:
-                    # Search for games with the same genres
-                    search_url = f"{RAWG_BASE_URL}/games"
-                    search_params = {
-                        "key": settings.RAWG_API_KEY,
-                        "genres": ",".join(genre_ids[:3]),  # Use up to 3 genres for better matching
-                        "page_size": 10,  # Get more to filter better
-                        "ordering": "-rating",  # Order by rating
-                        "metacritic": "70,100"  # Only well-rated games
-                    }
-                    print(f"Searching with genres: {','.join(genre_ids[:3])}")
-                    search_response = requests.get(search_url, params=search_params, timeout=10)
-                    
-                    if search_response.status_code == 200:
-                        search_data = search_response.json()
-                        all_results = search_data.get("results", [])
-                        
-                        # Filter out the current game and games without images
-                        similar = [
-                            g for g in all_results 
-                            if g.get("id") != game_data["id"] 
-                            and g.get("background_image")
-                            and g.get("rating", 0) > 3.5  # Only games with decent ratings
-                        ][:2]
-                        
-                        game_obj.similar_games = [
-                            {
-                                "id": g.get("id"),
-                                "name": g.get("name"),
-                                "background_image": g.get("background_image"),
-                                "rating": g.get("rating"),
-                                "genres": g.get("genres", [])[:1]
-                            }
-                            for g in similar
-                        ]
-                        print(f"Similar games fetched from genre search: {len(game_obj.similar_games)}")
-        except Exception as e:
-            print(f"Exception fetching similar games: {e}")
-            import traceback
-            traceback.print_exc()
-        
-        # Cache result (expire in 1 hour)
-        if r:
-            try:
-                r.setex(cache_key, 3600, game_obj.json())
-                print(f"Game cached successfully")
-            except Exception as e:
-                print(f"Redis cache write failed: {e}")
-            
-        return game_obj
+
+        return await game_service.fetch_game_data(game_slug)
 
     except HTTPException:
         raise
-    except requests.Timeout as e:
+    except httpx.TimeoutException as e:
         print(f"Request timeout: {e}")
         raise HTTPException(status_code=504, detail="Request to RAWG API timed out")
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"Request error: {e}")
         raise HTTPException(status_code=502, detail=f"Error communicating with RAWG API: {str(e)}")
     except Exception as e:
@@ -227,6 +113,165 @@ async def get_game_details(game_name: str):
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+async def _cache_game(cache_key: str, game_obj: Game) -> Tuple[str, str]:
+    """
+    Cache a game under its lookup name and its id (expire in 1 hour). The ETag
+    is stored next to the name entry, the one /game/{name} revalidates; /games
+    reads id entries without ETags. Returns the serialized game and its ETag.
+    """
+    game_json = game_obj.json()
+    etag = http_cache.make_etag(game_json)
+    entries = {cache_key: game_json, f"etag:{cache_key}": etag, f"game:id:{game_obj.id}": game_json}
+    if await cache.setex_many(entries, GAME_CACHE_TTL):
+        print(f"Game cached successfully")
+    return game_json, etag
+
+@router.get("/game/{game_name}", response_model=Game)
+async def get_game_details(game_name: str, if_none_match: Optional[str] = Header(None)):
+    """
+    Fetch game details from RAWG, parse system requirements, and return aggregated data.
+    Cached games are answered with their stored ETag (304 if the client has it).
+    """
+    if not settings.RAWG_API_KEY:
+        raise HTTPException(status_code=500, detail="RAWG API Key not configured")
+
+    # Check cache
+    cache_key = f"game:{game_name}"
+    cached_data, etag = await cache.mget([cache_key, f"etag:{cache_key}"])
+    if cached_data:
+        etag = etag or http_cache.make_etag(cached_data)
+        if http_cache.etag_matches(if_none_match, etag):
+            return http_cache.not_modified(etag, http_cache.GAME_CACHE_CONTROL, "Accept-Encoding")
+        return http_cache.json_response(cached_data, etag, http_cache.GAME_CACHE_CONTROL, "Accept-Encoding")
+
+    game_data = await _fetch_game_data_by_name(game_name)
+    game_obj = game_service.build_game(game_data)
+    game_obj.similar_games = await game_service.fetch_similar_games(game_data)
+
+    game_json, etag = await _cache_game(cache_key, game_obj)
+    return http_cache.json_response(game_json, etag, http_cache.GAME_CACHE_CONTROL, "Accept-Encoding")
+
+@router.get("/game/{game_name}/stream")
+async def stream_game_details(game_name: str):
+    """
+    Progressive variant of /game/{game_name}, sent as NDJSON events:
+    `game` (core fields) as soon as the detail fetch finishes, then
+    `requirements` (parsed min/rec and file size), then `similar_games`.
+    """
+    if not settings.RAWG_API_KEY:
+        raise HTTPException(status_code=500, detail="RAWG API Key not configured")
+
+    def event(name: str, data) -> str:
+        return json.dumps({"event": name, "data": data}) + "\n"
+
+    def requirements_event(game: dict) -> str:
+        return event("requirements", {key: game.get(key) for key in STREAM_REQUIREMENT_FIELDS})
+
+    def core_fields(game: dict) -> dict:
+        return {k: v for k, v in game.items() if k not in STREAM_REQUIREMENT_FIELDS and k != "similar_games"}
+
+    # A cached game is sent as all three events at once
+    cache_key = f"game:{game_name}"
+    cached_data = await cache.get(cache_key)
+    if cached_data:
+        cached_game = json.loads(cached_data)
+
+        async def cached_events():
+            yield event("game", core_fields(cached_game))
+            yield requirements_event(cached_game)
+            yield event("similar_games", cached_game.get("similar_games") or [])
+
+        return StreamingResponse(cached_events(), media_type="application/x-ndjson")
+
+    # Upstream errors still get a proper status code: nothing is streamed before the details arrive
+    game_data = await _fetch_game_data_by_name(game_name)
+
+    async def events():
+        similar_task = asyncio.ensure_future(game_service.fetch_similar_games(game_data))
+        try:
+            game_obj = game_service.build_game(game_data)
+            game = json.loads(game_obj.json())
+            yield event("game", core_fields(game))
+            yield requirements_event(game)
+
+            game_obj.similar_games = await similar_task
+            yield event("similar_games", game_obj.similar_games)
+        finally:
+            similar_task.cancel()
+        await _cache_game(cache_key, game_obj)
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+def _batch_error(e: Exception) -> dict:
+    """Map an exception raised while fetching one game of a batch to a per-item error."""
+    if isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 404:
+        return {"status": 404, "detail": "Game not found"}
+    if isinstance(e, httpx.TimeoutException):
+        return {"status": 504, "detail": "Request to RAWG API timed out"}
+    if isinstance(e, httpx.HTTPError):
+        return {"status": 502, "detail": f"Error communicating with RAWG API: {str(e)}"}
+    return {"status": 500, "detail": f"Internal server error: {str(e)}"}
+
+@router.get("/games")
+async def get_games_batch(
+    ids: str = Query(..., description="Comma-separated RAWG game ids"),
+    stream: bool = Query(False, description="Stream items as NDJSON as soon as each one is ready")
+):
+    """
+    Fetch details for several games at once. All ids are looked up in the cache with
+    one MGET, only the misses are fetched from RAWG (with bounded concurrency), and
+    each item carries either `game` or `error`.
+    """
+    try:
+        game_ids = [int(i) for i in ids.split(",") if i.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+    if not game_ids:
+        raise HTTPException(status_code=400, detail="No game ids given")
+    if len(game_ids) > BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_IDS} ids per request")
+    if not settings.RAWG_API_KEY:
+        raise HTTPException(status_code=500, detail="RAWG API Key not configured")
+
+    unique_ids = list(dict.fromkeys(game_ids))
+    cached = await cache.mget([f"game:id:{i}" for i in unique_ids])
+
+    items = {}
+    for game_id, cached_data in zip(unique_ids, cached):
+        if cached_data:
+            items[game_id] = {"id": game_id, "game": json.loads(cached_data)}
+    misses = [i for i in unique_ids if i not in items]
+
+    semaphore = asyncio.Semaphore(settings.RAWG_MAX_CONCURRENCY)
+    fetched = {}
+
+    async def load(game_id: int) -> dict:
+        async with semaphore:
+            try:
+                game_obj = await game_service.fetch_game(game_id)
+            except Exception as e:
+                print(f"Batch fetch failed for game {game_id}: {e}")
+                return {"id": game_id, "error": _batch_error(e)}
+        game_json = game_obj.json()
+        fetched[f"game:id:{game_id}"] = game_json
+        return {"id": game_id, "game": json.loads(game_json)}
+
+    if stream:
+        async def ndjson():
+            for item in items.values():
+                yield json.dumps(item) + "\n"
+            for next_item in asyncio.as_completed([load(i) for i in misses]):
+                yield json.dumps(await next_item) + "\n"
+            await cache.setex_many(fetched, GAME_CACHE_TTL)
+
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    for item in await asyncio.gather(*(load(i) for i in misses)):
+        items[item["id"]] = item
+    await cache.setex_many(fetched, GAME_CACHE_TTL)
+
+    return {"results": [items[i] for i in game_ids]}
+
 # ============ AUTHENTICATION ENDPOINTS ============
 
 @router.post("/auth/register", response_model=UserResponse)
@@ -278,13 +323,44 @@ async def login_user(login_data: UserLogin):
 # ============ FAVORITES ENDPOINTS ============
 
 @router.get("/favorites", response_model=list[FavoriteResponse])
-async def get_favorites(current_user: dict = Depends(auth.get_current_user)):
-    """Get all favorites for the current user."""
-    favorites = database.get_user_favorites(current_user['user_id'])
-    return favorites
+async def get_favorites(
+    background_tasks: BackgroundTasks,
+    rig_id: Optional[int] = None,
+    if_none_match: Optional[str] = Header(None),
+    current_user: dict = Depends(auth.get_current_user)
+):
+    """
+    Get all favorites for the current user, with precomputed compatibility
+    for a rig profile (the default one if rig_id is not given). Games that
+    need requirements from RAWG are computed in the background, never inline.
+    The ETag comes from a per-user version counter, so a 304 needs no list query;
+    failed games due for a retry are still scheduled on a 304.
+    """
+    user_id = current_user['user_id']
+    if rig_id is not None and not database.get_rig_profile(user_id, rig_id):
+        raise HTTPException(status_code=404, detail="Configuração não encontrada")
+
+    def favorites_etag() -> str:
+        version = database.get_favorites_version(user_id)
+        return f'"fav-{user_id}-{version}-{rig_id or 0}-{rankings.get_rankings().version}"'
+
+    etag = favorites_etag()
+    if http_cache.etag_matches(if_none_match, etag):
+        # The list is unchanged, but failed games may be due for another try
+        rig, due = compat_service.due_retries(user_id, rig_id)
+        if due:
+            background_tasks.add_task(compat_service.refresh_in_background, user_id, rig, due)
+        return http_cache.not_modified(etag, http_cache.FAVORITES_CACHE_CONTROL, "Authorization")
+
+    favorites, rig, pending = await compat_service.get_favorites_with_compatibility(user_id, rig_id)
+    if pending:
+        background_tasks.add_task(compat_service.refresh_in_background, user_id, rig, pending)
+    body = json.dumps(jsonable_encoder([FavoriteResponse(**f) for f in favorites]))
+    # Recomputing stale compatibility bumps the version, so read it again
+    return http_cache.json_response(body, favorites_etag(), http_cache.FAVORITES_CACHE_CONTROL, "Authorization")
 
 @router.post("/favorites")
-async def add_favorite(favorite: FavoriteGame, current_user: dict = Depends(auth.get_current_user)):
+async def add_favorite(favorite: FavoriteGame, background_tasks: BackgroundTasks, current_user: dict = Depends(auth.get_current_user)):
     """Add a game to user's favorites."""
     success = database.add_favorite(
         current_user['user_id'],
@@ -297,6 +373,9 @@ async def add_favorite(favorite: FavoriteGame, current_user: dict = Depends(auth
     if not success:
         raise HTTPException(status_code=400, detail="Jogo já está nos favoritos")
     
+    # Precompute compatibility with the user's rigs after responding
+    background_tasks.add_task(compat_service.refresh_for_favorite, current_user['user_id'], favorite.game_id)
+    
     return {"message": "Jogo adicionado aos favoritos"}
 
 @router.delete("/favorites/{game_id}")
@@ -309,51 +388,87 @@ async def remove_favorite(game_id: int, current_user: dict = Depends(auth.get_cu
     
     return {"message": "Jogo removido dos favoritos"}
 
+# ============ RIG PROFILE ENDPOINTS ============
+
+@router.get("/rigs", response_model=list[RigProfileResponse])
+async def get_rigs(current_user: dict = Depends(auth.get_current_user)):
+    """Get all rig profiles of the current user."""
+    return database.get_user_rigs(current_user['user_id'])
+
+@router.post("/rigs", response_model=RigProfileResponse)
+async def create_rig(rig: RigProfile, background_tasks: BackgroundTasks, current_user: dict = Depends(auth.get_current_user)):
+    """Save a rig profile and precompute its compatibility with the user's favorites."""
+    rig_id = database.create_rig_profile(
+        current_user['user_id'], rig.name, rig.cpu, rig.gpu, rig.ram, rig.is_default
+    )
+    background_tasks.add_task(compat_service.refresh_for_rig, current_user['user_id'], rig_id)
+    return database.get_rig_profile(current_user['user_id'], rig_id)
+
+@router.put("/rigs/{rig_id}", response_model=RigProfileResponse)
+async def update_rig(rig_id: int, rig: RigProfile, background_tasks: BackgroundTasks, current_user: dict = Depends(auth.get_current_user)):
+    """Update a rig profile; its compatibility results are recomputed."""
+    success = database.update_rig_profile(
+        current_user['user_id'], rig_id, rig.name, rig.cpu, rig.gpu, rig.ram, rig.is_default
+    )
+    if not success:
+        raise HTTPException(status_code=404, detail="Configuração não encontrada")
+    
+    background_tasks.add_task(compat_service.refresh_for_rig, current_user['user_id'], rig_id)
+    return database.get_rig_profile(current_user['user_id'], rig_id)
+
+@router.delete("/rigs/{rig_id}")
+async def delete_rig(rig_id: int, current_user: dict = Depends(auth.get_current_user)):
+    """Delete a rig profile."""
+    success = database.delete_rig_profile(current_user['user_id'], rig_id)
+    
+    if not success:
+        raise HTTPException(status_code=404, detail="Configuração não encontrada")
+    
+    return {"message": "Configuração removida"}
+
 # ============ HARDWARE COMPARISON ENDPOINT ============
 
 @router.post("/compare", response_model=CompareResponse)
-async def compare_hardware(compare_data: CompareRequest):
-    """Compare user's hardware specs against game requirements."""
-    # Fetch game details to get requirements
+async def compare_hardware(compare_data: CompareRequest, current_user: Optional[dict] = Depends(auth.get_optional_user)):
+    """
+    Compare user's hardware specs against game requirements. The specs are either
+    sent in the request or taken from one of the user's saved rig profiles (rig_id).
+    """
+    if compare_data.rig_id is not None:
+        if current_user is None:
+            raise HTTPException(status_code=401, detail="Faça login para usar uma configuração salva")
+        rig = database.get_rig_profile(current_user['user_id'], compare_data.rig_id)
+        if not rig:
+            raise HTTPException(status_code=404, detail="Configuração não encontrada")
+    elif compare_data.user_cpu and compare_data.user_gpu and compare_data.user_ram:
+        rig = {"cpu": compare_data.user_cpu, "gpu": compare_data.user_gpu, "ram": compare_data.user_ram}
+    else:
+        raise HTTPException(status_code=400, detail="Informe CPU, GPU e RAM ou uma configuração salva")
+
+    # Results depend on the ranking data, so its version is part of the cache key
+    def compare_cache_key(version: str) -> str:
+        specs = f"{rig['cpu']}|{rig['gpu']}|{rig['ram']}".lower()
+        return f"compare:{version}:{compare_data.game_id}:{hashlib.sha1(specs.encode('utf-8')).hexdigest()}"
+
+    cached_data = await cache.get(compare_cache_key(rankings.get_rankings().version))
+    if cached_data:
+        return json.loads(cached_data)
+
     try:
-        # Search for the game by ID
-        detail_url = f"{RAWG_BASE_URL}/games/{compare_data.game_id}"
-        response = requests.get(detail_url, params={"key": settings.RAWG_API_KEY}, timeout=10)
-        response.raise_for_status()
-        game_data = response.json()
-        
-        # Parse requirements
-        platforms = game_data.get("platforms", [])
-        pc_requirements = {}
+        # Requirement scores are resolved once per ranking version and stored
+        scores = await compat_service.get_requirement_scores(compare_data.game_id)
         
-        for p in platforms:
-            if p.get("platform", {}).get("slug") == "pc":
-                pc_requirements = p.get("requirements", {})
-                break
+        # Compare specs; details and messages are only rendered for the response
+        result = compat_service.check_rig(rig, scores)
         
-        parsed_min = parse_requirements(pc_requirements.get("minimum", ""))
-        parsed_rec = parse_requirements(pc_requirements.get("recommended", ""))
+        compare_response = CompareResponse(**comparator.describe(result, rig["cpu"], rig["gpu"], scores))
+        await cache.setex(compare_cache_key(compare_response.ranking_version), COMPARE_CACHE_TTL, compare_response.json())
+        return compare_response
         
-        # Compare specs
-        result = comparator.compare_specs(
-            user_cpu=compare_data.user_cpu,
-            user_gpu=compare_data.user_gpu,
-            user_ram=compare_data.user_ram,
-            min_cpu=parsed_min.cpu,
-            min_gpu=parsed_min.gpu,
-            min_ram=parsed_min.ram,
-            rec_cpu=parsed_rec.cpu,
-            rec_gpu=parsed_rec.gpu,
-            rec_ram=parsed_rec.ram
-        )
-        
-        return CompareResponse(**result)
-        
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=502, detail=f"Erro ao buscar dados do jogo: {str(e)}")
     except Exception as e:
         print(f"Error in compare_hardware: {e}")
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Erro ao comparar especificações: {str(e)}")
-
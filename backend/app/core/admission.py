@@ -0,0 +1,119 @@
+import json
+import asyncio
+from typing import Optional, List, Dict, Any
+
+class AdmissionLimiter:
+    """
+    Concurrency limit with a short bounded queue for one class of routes.
+    Requests beyond `max_concurrency` wait in a queue of at most `max_queue`
+    entries for up to `queue_timeout` seconds; anything else is shed.
+    """
+
+    def __init__(self, name: str, prefixes: List[str], max_concurrency: int, max_queue: int,
+                 queue_timeout: float, deadline: float, retry_after: int):
+        self.name = name
+        self.prefixes = tuple(prefixes)
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.deadline = deadline
+        self.retry_after = retry_after
+        self.waiting = 0
+        # Created on first use so it binds to the server's event loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def matches(self, path: str) -> bool:
+        return any(path == p or path.startswith(p.rstrip("/") + "/") for p in self.prefixes)
+
+    async def acquire(self) -> bool:
+        """Take a slot; False if the request should be shed."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+            return True
+        if self.waiting >= self.max_queue:
+            return False
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.waiting -= 1
+
+    def release(self):
+        self._semaphore.release()
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware applying an AdmissionLimiter per route class. Shed requests
+    get an immediate 503 with Retry-After; admitted requests that haven't started
+    their response within the class deadline are cancelled with a 504. Routes
+    outside every class are not limited.
+    """
+
+    def __init__(self, app, limiters: List[AdmissionLimiter]):
+        self.app = app
+        self.limiters = limiters
+
+    async def __call__(self, scope, receive, send):
+        limiter = None
+        if scope["type"] == "http":
+            limiter = next((l for l in self.limiters if l.matches(scope["path"])), None)
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await limiter.acquire():
+            print(f"Admission: shedding {scope['path']} ({limiter.name} at capacity)")
+            await _reject(send, 503, "Servidor ocupado, tente novamente em instantes", limiter.retry_after)
+            return
+
+        try:
+            await self._run_with_deadline(limiter, scope, receive, send)
+        finally:
+            limiter.release()
+
+    async def _run_with_deadline(self, limiter: AdmissionLimiter, scope, receive, send):
+        # The deadline covers the time until the response starts; streams may run longer
+        started = asyncio.Event()
+
+        async def send_wrapper(message: Dict[str, Any]):
+            if message["type"] == "http.response.start":
+                started.set()
+            await send(message)
+
+        task = asyncio.ensure_future(self.app(scope, receive, send_wrapper))
+        waiter = asyncio.ensure_future(started.wait())
+        try:
+            done, _ = await asyncio.wait({task, waiter}, timeout=limiter.deadline, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            waiter.cancel()
+
+        if not done:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            print(f"Admission: {scope['path']} exceeded the {limiter.deadline}s deadline")
+            await _reject(send, 504, "Tempo limite da requisição excedido", limiter.retry_after)
+            return
+
+        await task
+
+async def _reject(send, status: int, detail: str, retry_after: int):
+    body = json.dumps({"detail": detail}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(retry_after).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,75 @@
+from typing import Optional, List, Dict
+import redis.asyncio as aioredis
+from app.core.config import settings
+
+# Shared asyncio client, created in the app lifespan (init_cache/close_cache)
+_client: Optional[aioredis.Redis] = None
+
+async def init_cache():
+    """Create the pooled Redis client. A failing ping only logs: cache calls degrade to misses."""
+    global _client
+    pool = aioredis.ConnectionPool.from_url(
+        settings.REDIS_URL,
+        decode_responses=True,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+    )
+    _client = aioredis.Redis(connection_pool=pool)
+    try:
+        await _client.ping()
+    except Exception as e:
+        print(f"Warning: Redis connection failed: {e}")
+
+async def close_cache():
+    """Close the client and its connection pool."""
+    global _client
+    if _client:
+        await _client.aclose()
+        _client = None
+
+async def get(key: str) -> Optional[str]:
+    """Get a cached value, None on miss or Redis error."""
+    if not _client:
+        return None
+    try:
+        return await _client.get(key)
+    except Exception as e:
+        print(f"Redis cache read failed: {e}")
+        return None
+
+async def setex(key: str, ttl: int, value: str) -> bool:
+    """Cache a value for `ttl` seconds."""
+    if not _client:
+        return False
+    try:
+        await _client.setex(key, ttl, value)
+        return True
+    except Exception as e:
+        print(f"Redis cache write failed: {e}")
+        return False
+
+async def mget(keys: List[str]) -> List[Optional[str]]:
+    """Get several cached values in one round trip (None for each miss)."""
+    if not _client or not keys:
+        return [None] * len(keys)
+    try:
+        return await _client.mget(keys)
+    except Exception as e:
+        print(f"Redis cache read failed: {e}")
+        return [None] * len(keys)
+
+async def setex_many(items: Dict[str, str], ttl: int) -> bool:
+    """Cache several values for `ttl` seconds with one pipelined round trip."""
+    if not _client or not items:
+        return False
+    try:
+        async with _client.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                pipe.setex(key, ttl, value)
+            await pipe.execute()
+        return True
+    except Exception as e:
+        print(f"Redis cache write failed: {e}")
+        return False
@@ -0,0 +1,430 @@
+import re
+import sys
+import json
+import difflib
+import unicodedata
+from typing import Optional, List, Dict, Any, Iterable
+
+from app.core.database import get_db_connection
+
+# Fields kept for each game, taken from RAWG list/detail payloads
+CATALOG_FIELDS = (
+    "id", "slug", "name", "background_image", "rating",
+    "ratings_count", "added", "metacritic", "released", "updated", "search_rank"
+)
+
+# search_rank packs (added DESC, rating DESC, id) into one integer used as the
+# FTS rowid, so matches come out of the index already in popularity order
+_RANK_ADDED_MAX = (1 << 20) - 1
+_RANK_RATING_MAX = 500
+
+# Fuzzy matching only kicks in for tokens at least this long
+FUZZY_MIN_TOKEN = 3
+FUZZY_CUTOFF = 0.75
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+# Words as the FTS tokenizer indexes them (letters and digits only)
+_WORD_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+def init_catalog():
+    """Create the catalog tables and the FTS5 index kept in sync by triggers."""
+    conn = get_db_connection()
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS catalog_games (
+            id INTEGER PRIMARY KEY,
+            slug TEXT NOT NULL,
+            name TEXT NOT NULL,
+            background_image TEXT,
+            rating REAL DEFAULT 0,
+            ratings_count INTEGER DEFAULT 0,
+            added INTEGER DEFAULT 0,
+            metacritic INTEGER,
+            released TEXT,
+            updated TEXT,
+            search_rank INTEGER
+        );
+    ''')
+    rebuild_needed = _migrate_search_rank(conn)
+    conn.executescript('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_catalog_games_search_rank ON catalog_games (search_rank);
+
+        CREATE VIRTUAL TABLE IF NOT EXISTS catalog_fts USING fts5(
+            name,
+            content='catalog_games',
+            content_rowid='search_rank',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='1 2 3'
+        );
+
+        CREATE VIRTUAL TABLE IF NOT EXISTS catalog_vocab USING fts5vocab(catalog_fts, 'row');
+
+        CREATE TRIGGER IF NOT EXISTS catalog_games_ai AFTER INSERT ON catalog_games BEGIN
+            INSERT INTO catalog_fts(rowid, name) VALUES (new.search_rank, new.name);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS catalog_games_ad AFTER DELETE ON catalog_games BEGIN
+            INSERT INTO catalog_fts(catalog_fts, rowid, name) VALUES ('delete', old.search_rank, old.name);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS catalog_games_au AFTER UPDATE OF name, search_rank ON catalog_games BEGIN
+            INSERT INTO catalog_fts(catalog_fts, rowid, name) VALUES ('delete', old.search_rank, old.name);
+            INSERT INTO catalog_fts(rowid, name) VALUES (new.search_rank, new.name);
+        END;
+
+        CREATE TABLE IF NOT EXISTS catalog_requirements (
+            game_id INTEGER PRIMARY KEY,
+            minimum TEXT,
+            recommended TEXT,
+            parsed_min TEXT,
+            parsed_rec TEXT,
+            updated TEXT,
+            FOREIGN KEY (game_id) REFERENCES catalog_games (id) ON DELETE CASCADE
+        );
+
+        CREATE TABLE IF NOT EXISTS catalog_sync_state (
+            name TEXT PRIMARY KEY,
+            high_water TEXT,
+            run_high_water TEXT,
+            next_page INTEGER,
+            high_water_ids TEXT,
+            run_high_water_ids TEXT
+        );
+
+        CREATE TABLE IF NOT EXISTS catalog_sync_failures (
+            name TEXT NOT NULL,
+            game_id INTEGER NOT NULL,
+            updated TEXT,
+            attempts INTEGER DEFAULT 1,
+            last_error TEXT,
+            PRIMARY KEY (name, game_id)
+        );
+    ''')
+    if rebuild_needed:
+        conn.execute("INSERT INTO catalog_fts(catalog_fts) VALUES ('rebuild')")
+    # Sync states saved before ties at the high-water mark were tracked
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(catalog_sync_state)')]
+    for column in ("high_water_ids", "run_high_water_ids"):
+        if column not in columns:
+            conn.execute(f'ALTER TABLE catalog_sync_state ADD COLUMN {column} TEXT')
+    conn.commit()
+    conn.close()
+
+def _migrate_search_rank(conn) -> bool:
+    """
+    Catalogs created before search_rank existed were indexed by game id:
+    add and fill the column, and drop the old index and triggers so they are
+    recreated on search_rank. Returns True if the FTS index must be rebuilt.
+    """
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(catalog_games)')]
+    if "search_rank" in columns:
+        return False
+    conn.execute('ALTER TABLE catalog_games ADD COLUMN search_rank INTEGER')
+    rows = conn.execute('SELECT id, added, rating FROM catalog_games').fetchall()
+    conn.executemany(
+        'UPDATE catalog_games SET search_rank = ? WHERE id = ?',
+        [(search_rank({"id": r[0], "added": r[1], "rating": r[2]}), r[0]) for r in rows]
+    )
+    conn.executescript('''
+        DROP TRIGGER IF EXISTS catalog_games_ai;
+        DROP TRIGGER IF EXISTS catalog_games_ad;
+        DROP TRIGGER IF EXISTS catalog_games_au;
+        DROP TABLE IF EXISTS catalog_vocab;
+        DROP TABLE IF EXISTS catalog_fts;
+    ''')
+    return True
+
+def search_rank(game: Dict[str, Any]) -> int:
+    """Sort key of a game in search results: most added first, then best rated, then lowest id."""
+    added = min(max(int(game.get("added") or 0), 0), _RANK_ADDED_MAX)
+    rating = min(max(round((game.get("rating") or 0) * 100), 0), _RANK_RATING_MAX)
+    return ((_RANK_ADDED_MAX - added) << 42) | ((_RANK_RATING_MAX - rating) << 32) | int(game["id"])
+
+def _catalog_row(game: Dict[str, Any]) -> tuple:
+    """Map a RAWG game payload to a catalog_games row."""
+    return (
+        game["id"],
+        game.get("slug") or "",
+        game["name"],
+        game.get("background_image"),
+        game.get("rating") or 0,
+        game.get("ratings_count") or 0,
+        game.get("added") or 0,
+        game.get("metacritic"),
+        game.get("released"),
+        game.get("updated"),
+        search_rank(game),
+    )
+
+def warm_catalog() -> int:
+    """Read the whole FTS index once so its pages are cached before the first search. Returns the term count."""
+    conn = get_db_connection()
+    terms = conn.execute('SELECT COUNT(*) FROM catalog_vocab').fetchone()[0]
+    conn.execute('SELECT COUNT(*) FROM catalog_games').fetchone()
+    conn.close()
+    return terms
+
+def upsert_games(games: Iterable[Dict[str, Any]]) -> int:
+    """
+    Insert or update RAWG game payloads in bulk. Rows whose RAWG `updated` is not
+    newer than the stored one are left untouched. Returns the number of rows written.
+    """
+    rows = [_catalog_row(g) for g in games if g.get("id") and g.get("name")]
+    if not rows:
+        return 0
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.executemany(f'''
+        INSERT INTO catalog_games ({", ".join(CATALOG_FIELDS)})
+        VALUES ({", ".join("?" for _ in CATALOG_FIELDS)})
+        ON CONFLICT(id) DO UPDATE SET
+            slug = excluded.slug,
+            name = excluded.name,
+            background_image = excluded.background_image,
+            rating = excluded.rating,
+            ratings_count = excluded.ratings_count,
+            added = excluded.added,
+            metacritic = excluded.metacritic,
+            released = excluded.released,
+            updated = excluded.updated,
+            search_rank = excluded.search_rank
+        WHERE catalog_games.updated IS NULL
+           OR excluded.updated IS NULL
+           OR excluded.updated > catalog_games.updated
+    ''', rows)
+    written = cursor.rowcount
+    conn.commit()
+    conn.close()
+    return written
+
+def upsert_requirements(rows: Iterable[Dict[str, Any]]) -> List[int]:
+    """
+    Store raw and parsed PC requirements in bulk. Each row holds game_id, minimum,
+    recommended, parsed_min, parsed_rec (JSON strings) and the game's RAWG `updated`.
+    Rows not newer than the stored ones are skipped. Returns the ids written.
+    """
+    values = [
+        (r["game_id"], r.get("minimum"), r.get("recommended"),
+         r.get("parsed_min"), r.get("parsed_rec"), r.get("updated"))
+        for r in rows
+    ]
+    if not values:
+        return []
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    written = []
+    for row in values:
+        cursor.execute('''
+            INSERT INTO catalog_requirements (game_id, minimum, recommended, parsed_min, parsed_rec, updated)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(game_id) DO UPDATE SET
+                minimum = excluded.minimum,
+                recommended = excluded.recommended,
+                parsed_min = excluded.parsed_min,
+                parsed_rec = excluded.parsed_rec,
+                updated = excluded.updated
+            WHERE catalog_requirements.updated IS NULL
+               OR excluded.updated IS NULL
+               OR excluded.updated > catalog_requirements.updated
+        ''', row)
+        if cursor.rowcount:
+            written.append(row[0])
+    conn.commit()
+    conn.close()
+    return written
+
+def get_requirements(game_id: int) -> Optional[Dict[str, Any]]:
+    """Get the stored requirements of a game, parsed_min/parsed_rec decoded to dicts."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('SELECT * FROM catalog_requirements WHERE game_id = ?', (game_id,))
+    row = cursor.fetchone()
+    conn.close()
+
+    if not row:
+        return None
+    data = dict(row)
+    for key in ("parsed_min", "parsed_rec"):
+        data[key] = json.loads(data[key]) if data[key] else {}
+    return data
+
+def get_sync_state(name: str) -> Dict[str, Any]:
+    """Get the checkpoint of a sync job (empty values if it never ran)."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('SELECT * FROM catalog_sync_state WHERE name = ?', (name,))
+    row = cursor.fetchone()
+    conn.close()
+
+    if not row:
+        return {"name": name, "high_water": None, "run_high_water": None, "next_page": None,
+                "high_water_ids": [], "run_high_water_ids": []}
+    state = dict(row)
+    for column in ("high_water_ids", "run_high_water_ids"):
+        state[column] = json.loads(state[column]) if state[column] else []
+    return state
+
+def save_sync_state(
+    name: str,
+    high_water: Optional[str],
+    run_high_water: Optional[str],
+    next_page: Optional[int],
+    high_water_ids: Iterable[int] = (),
+    run_high_water_ids: Iterable[int] = ()
+):
+    """Persist the checkpoint of a sync job, with the ids already synced at each mark's timestamp."""
+    conn = get_db_connection()
+    conn.execute('''
+        INSERT INTO catalog_sync_state (name, high_water, run_high_water, next_page, high_water_ids, run_high_water_ids)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET
+            high_water = excluded.high_water,
+            run_high_water = excluded.run_high_water,
+            next_page = excluded.next_page,
+            high_water_ids = excluded.high_water_ids,
+            run_high_water_ids = excluded.run_high_water_ids
+    ''', (name, high_water, run_high_water, next_page,
+          json.dumps(sorted(high_water_ids)), json.dumps(sorted(run_high_water_ids))))
+    conn.commit()
+    conn.close()
+
+def add_sync_failures(name: str, failures: Iterable[Dict[str, Any]]):
+    """Remember games whose details a sync job couldn't fetch ({game_id, updated, error}), counting attempts."""
+    conn = get_db_connection()
+    conn.executemany('''
+        INSERT INTO catalog_sync_failures (name, game_id, updated, last_error)
+        VALUES (:name, :game_id, :updated, :error)
+        ON CONFLICT(name, game_id) DO UPDATE SET
+            updated = COALESCE(excluded.updated, catalog_sync_failures.updated),
+            attempts = catalog_sync_failures.attempts + 1,
+            last_error = excluded.last_error
+    ''', [dict(f, name=name) for f in failures])
+    conn.commit()
+    conn.close()
+
+def get_sync_failures(name: str, limit: int, max_attempts: int) -> List[Dict[str, Any]]:
+    """Games a sync job still has to retry (below max_attempts), fewest attempts first."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT game_id, updated, attempts FROM catalog_sync_failures
+        WHERE name = ? AND attempts < ?
+        ORDER BY attempts, game_id LIMIT ?
+    ''', (name, max_attempts, limit))
+    rows = cursor.fetchall()
+    conn.close()
+    return [dict(row) for row in rows]
+
+def clear_sync_failures(name: str, game_ids: Iterable[int]):
+    conn = get_db_connection()
+    conn.executemany(
+        'DELETE FROM catalog_sync_failures WHERE name = ? AND game_id = ?',
+        [(name, game_id) for game_id in game_ids]
+    )
+    conn.commit()
+    conn.close()
+
+def tokenize(query: str) -> List[str]:
+    """Split a query into lowercase word tokens (same boundaries as the FTS tokenizer)."""
+    return _TOKEN_RE.findall(query.lower())
+
+def _prefix_expression(tokens: List[str]) -> str:
+    return " AND ".join(f'"{t}"*' for t in tokens)
+
+def _fuzzy_expression(conn, tokens: List[str]) -> Optional[str]:
+    """
+    Build an FTS expression where each token also matches close spellings
+    found in the index vocabulary. Returns None if nothing new would match.
+    """
+    groups = []
+    expanded = False
+    for token in tokens:
+        alternatives = [f'"{token}"*']
+        if len(token) >= FUZZY_MIN_TOKEN:
+            # Only terms sharing the first two letters are considered, keeps the scan small
+            cursor = conn.execute(
+                'SELECT term FROM catalog_vocab WHERE term >= ? AND term < ?',
+                (token[:2], token[:2] + '\uffff')
+            )
+            candidates = [row[0] for row in cursor.fetchall()]
+            close = difflib.get_close_matches(token, candidates, n=3, cutoff=FUZZY_CUTOFF)
+            for term in close:
+                if not term.startswith(token):
+                    alternatives.append(f'"{term}"')
+                    expanded = True
+        groups.append("(" + " OR ".join(alternatives) + ")")
+    return " AND ".join(groups) if expanded else None
+
+def _run_match(conn, expression: str, limit: int) -> List[Dict[str, Any]]:
+    # Rowids are search ranks, so the first matches are the most popular ones
+    cursor = conn.execute('''
+        SELECT g.id, g.name, g.slug, g.background_image, g.rating, g.released
+        FROM (SELECT rowid FROM catalog_fts WHERE catalog_fts MATCH ? ORDER BY rowid LIMIT ?) AS m
+        JOIN catalog_games g ON g.search_rank = m.rowid
+        ORDER BY m.rowid
+    ''', (expression, limit))
+    return [dict(row) for row in cursor.fetchall()]
+
+def prefix_matches(query: str, depth: int) -> List[Dict[str, Any]]:
+    """Up to `depth` games matching every query token as a name prefix (no fuzzy step), in search order."""
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+    conn = get_db_connection()
+    try:
+        return _run_match(conn, _prefix_expression(tokens), depth)
+    finally:
+        conn.close()
+
+def name_matches(name: str, tokens: List[str]) -> bool:
+    """
+    Whether every token is a prefix of some word of `name`, folding case and
+    diacritics like the FTS index does. Tokens must be plain ASCII letters/digits.
+    """
+    folded = unicodedata.normalize("NFKD", name.lower())
+    words = _WORD_RE.findall("".join(c for c in folded if not unicodedata.combining(c)))
+    return all(any(w.startswith(t) for w in words) for t in tokens)
+
+def search(query: str, limit: int = 5) -> List[Dict[str, Any]]:
+    """
+    Search the local catalog. Every query token is matched as a name prefix;
+    if that finds fewer than `limit` games, misspelled tokens are retried
+    against close index terms. Results are ranked by popularity and rating.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+
+    conn = get_db_connection()
+    try:
+        results = _run_match(conn, _prefix_expression(tokens), limit)
+        if len(results) < limit:
+            fuzzy = _fuzzy_expression(conn, tokens)
+            if fuzzy:
+                seen = {g["id"] for g in results}
+                for game in _run_match(conn, fuzzy, limit):
+                    if game["id"] not in seen and len(results) < limit:
+                        results.append(game)
+        return results
+    finally:
+        conn.close()
+
+def ingest_file(path: str) -> int:
+    """Bulk load a RAWG dump: a JSON list, a RAWG page ({"results": [...]}) or JSON lines."""
+    with open(path, encoding='utf-8') as f:
+        content = f.read().strip()
+
+    try:
+        data = json.loads(content)
+        games = data.get("results", []) if isinstance(data, dict) else data
+    except json.JSONDecodeError:
+        games = [json.loads(line) for line in content.splitlines() if line.strip()]
+
+    return upsert_games(games)
+
+if __name__ == "__main__":
+    init_catalog()
+    for dump in sys.argv[1:]:
+        print(f"Ingested {ingest_file(dump)} games from {dump}")
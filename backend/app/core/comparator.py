@@ -1,55 +1,8 @@
 import re
-from typing import Optional, Dict, Tuple
-
-# GPU Rankings (simplified scoring system)
-GPU_RANKINGS = {
-    # NVIDIA RTX 40 series
-    'rtx 4090': 1000, 'rtx 4080': 950, 'rtx 4070 ti': 900, 'rtx 4070': 850, 'rtx 4060 ti': 800, 'rtx 4060': 750,
-    # NVIDIA RTX 30 series
-    'rtx 3090 ti': 920, 'rtx 3090': 900, 'rtx 3080 ti': 880, 'rtx 3080': 850, 'rtx 3070 ti': 800, 'rtx 3070': 750,
-    'rtx 3060 ti': 700, 'rtx 3060': 650, 'rtx 3050': 550,
-    # NVIDIA RTX 20 series
-    'rtx 2080 ti': 800, 'rtx 2080': 750, 'rtx 2070': 700, 'rtx 2060': 650,
-    # NVIDIA GTX 16 series
-    'gtx 1660 ti': 550, 'gtx 1660': 520, 'gtx 1650': 450,
-    # NVIDIA GTX 10 series
-    'gtx 1080 ti': 750, 'gtx 1080': 700, 'gtx 1070': 650, 'gtx 1060': 550, 'gtx 1050 ti': 400, 'gtx 1050': 350,
-    # AMD RX 7000 series
-    'rx 7900 xtx': 980, 'rx 7900 xt': 920, 'rx 7800 xt': 850, 'rx 7700 xt': 800, 'rx 7600': 650,
-    # AMD RX 6000 series
-    'rx 6950 xt': 900, 'rx 6900 xt': 880, 'rx 6800 xt': 850, 'rx 6800': 820, 'rx 6700 xt': 750,
-    'rx 6600 xt': 650, 'rx 6600': 600, 'rx 6500 xt': 450,
-    # AMD RX 5000 series
-    'rx 5700 xt': 700, 'rx 5700': 650, 'rx 5600 xt': 600, 'rx 5500 xt': 500,
-    # Intel Arc
-    'arc a770': 700, 'arc a750': 650, 'arc a580': 550, 'arc a380': 450,
-}
+from typing import Optional, Dict, Tuple, Any
+from app.core.rankings import Rankings, get_rankings
 
-# CPU Rankings (simplified scoring system)
-CPU_RANKINGS = {
-    # Intel 13th/14th gen
-    'i9-14900k': 1000, 'i9-13900k': 980, 'i7-14700k': 900, 'i7-13700k': 880,
-    'i5-14600k': 800, 'i5-13600k': 780, 'i5-14400': 700, 'i5-13400': 680,
-    'i3-14100': 550, 'i3-13100': 530,
-    # Intel 12th gen
-    'i9-12900k': 950, 'i7-12700k': 850, 'i5-12600k': 750, 'i5-12400': 650, 'i3-12100': 500,
-    # Intel 11th gen
-    'i9-11900k': 850, 'i7-11700k': 750, 'i5-11600k': 650, 'i5-11400': 550,
-    # Intel 10th gen
-    'i9-10900k': 800, 'i7-10700k': 700, 'i5-10600k': 600, 'i5-10400': 500, 'i3-10100': 400,
-    # Intel 9th gen and older
-    'i9-9900k': 750, 'i7-9700k': 650, 'i7-8700k': 600, 'i5-9600k': 550, 'i5-8400': 450,
-    'i7-7700k': 500, 'i5-7600k': 400, 'i7-6700k': 450, 'i5-6600k': 350, 'i3-6100': 250,
-    # AMD Ryzen 7000 series
-    'ryzen 9 7950x': 1000, 'ryzen 9 7900x': 950, 'ryzen 7 7700x': 850, 'ryzen 5 7600x': 750,
-    # AMD Ryzen 5000 series
-    'ryzen 9 5950x': 950, 'ryzen 9 5900x': 900, 'ryzen 7 5800x': 800, 'ryzen 7 5700x': 750,
-    'ryzen 5 5600x': 700, 'ryzen 5 5600': 680, 'ryzen 5 5500': 650,
-    # AMD Ryzen 3000 series
-    'ryzen 9 3950x': 850, 'ryzen 9 3900x': 800, 'ryzen 7 3700x': 700, 'ryzen 5 3600': 600,
-    # AMD Ryzen 2000 series
-    'ryzen 7 2700x': 600, 'ryzen 5 2600': 500,
-}
+# GPU/CPU scores live in the versioned data file loaded by app.core.rankings
 
 def normalize_gpu_name(gpu: str) -> str:
     """Normalize GPU name for comparison."""
@@ -69,29 +22,33 @@ def normalize_cpu_name(cpu: str) -> str:
     cpu = re.sub(r'\s+', ' ', cpu).strip()
     return cpu
 
-def get_gpu_score(gpu: str) -> int:
-    """Get performance score for a GPU."""
-    normalized = normalize_gpu_name(gpu)
-    
-    # Try exact match first
-    for key, score in GPU_RANKINGS.items():
-        if key in normalized:
-            return score
+def resolve_gpu(gpu: str, rankings: Optional[Rankings] = None) -> Tuple[int, Optional[str], float]:
+    """Resolve a GPU name to (score, matched model, confidence)."""
+    rankings = rankings or get_rankings()
+    found = rankings.gpu.resolve(normalize_gpu_name(gpu))
+    if found:
+        return found[1], found[0], found[2]
     
     # Default low score if not found
-    return 200
+    return rankings.default_score, None, 0.0
 
-def get_cpu_score(cpu: str) -> int:
-    """Get performance score for a CPU."""
-    normalized = normalize_cpu_name(cpu)
-    
-    # Try exact match first
-    for key, score in CPU_RANKINGS.items():
-        if key in normalized:
-            return score
+def resolve_cpu(cpu: str, rankings: Optional[Rankings] = None) -> Tuple[int, Optional[str], float]:
+    """Resolve a CPU name to (score, matched model, confidence)."""
+    rankings = rankings or get_rankings()
+    found = rankings.cpu.resolve(normalize_cpu_name(cpu))
+    if found:
+        return found[1], found[0], found[2]
     
     # Default low score if not found
-    return 200
+    return rankings.default_score, None, 0.0
+
+def get_gpu_score(gpu: str, rankings: Optional[Rankings] = None) -> int:
+    """Get performance score for a GPU."""
+    return resolve_gpu(gpu, rankings)[0]
+
+def get_cpu_score(cpu: str, rankings: Optional[Rankings] = None) -> int:
+    """Get performance score for a CPU."""
+    return resolve_cpu(cpu, rankings)[0]
 
 def extract_ram_gb(ram_text: str) -> Optional[int]:
     """Extract RAM amount in GB from text."""
@@ -101,140 +58,171 @@ def extract_ram_gb(ram_text: str) -> Optional[int]:
         return int(match.group(1))
     return None
 
-def compare_specs(
-    user_cpu: str,
-    user_gpu: str,
-    user_ram: str,
+def score_requirements(
     min_cpu: Optional[str],
     min_gpu: Optional[str],
     min_ram: Optional[str],
     rec_cpu: Optional[str],
     rec_gpu: Optional[str],
-    rec_ram: Optional[str]
-) -> Dict:
+    rec_ram: Optional[str],
+    rankings: Optional[Rankings] = None
+) -> Dict[str, Any]:
     """
-    Compare user specs against game requirements.
-    Returns detailed comparison results.
+    Resolve requirement strings to integer scores once, in the shape of a
+    game_requirements row (without game_id). Missing requirements stay None.
+    """
+    rankings = rankings or get_rankings()
+    scores: Dict[str, Any] = {"ranking_version": rankings.version}
+    for level, cpu, gpu, ram in (("min", min_cpu, min_gpu, min_ram), ("rec", rec_cpu, rec_gpu, rec_ram)):
+        for component, text, resolve in (("cpu", cpu, resolve_cpu), ("gpu", gpu, resolve_gpu)):
+            key = f"{level}_{component}"
+            score, model, confidence = resolve(text, rankings) if text else (None, None, None)
+            scores[key] = text or None
+            scores[key + "_score"] = score
+            scores[key + "_model"] = model
+            scores[key + "_confidence"] = confidence
+        scores[f"{level}_ram"] = ram or None
+        scores[f"{level}_ram_gb"] = extract_ram_gb(ram) if ram else None
+    return scores
+
+class CompareResult:
+    """
+    Compact outcome of one comparison: the user's scores and whether each
+    component meets the minimum/recommended requirements. Holds no details
+    or messages; see describe() for the full API representation.
     """
-    result = {
-        "can_run_minimum": False,
-        "can_run_recommended": False,
+    __slots__ = ("ranking_version", "cpu_score", "gpu_score", "ram_gb",
+                 "cpu_min", "cpu_rec", "gpu_min", "gpu_rec", "ram_min", "ram_rec")
+
+    def __init__(self, ranking_version: str, cpu_score: int, gpu_score: int, ram_gb: int,
+                 cpu_min: bool, cpu_rec: bool, gpu_min: bool, gpu_rec: bool, ram_min: bool, ram_rec: bool):
+        self.ranking_version = ranking_version
+        self.cpu_score = cpu_score
+        self.gpu_score = gpu_score
+        self.ram_gb = ram_gb
+        self.cpu_min = cpu_min
+        self.cpu_rec = cpu_rec
+        self.gpu_min = gpu_min
+        self.gpu_rec = gpu_rec
+        self.ram_min = ram_min
+        self.ram_rec = ram_rec
+
+    @property
+    def can_run_minimum(self) -> bool:
+        return self.cpu_min and self.gpu_min and self.ram_min
+
+    @property
+    def can_run_recommended(self) -> bool:
+        return self.cpu_rec and self.gpu_rec and self.ram_rec
+
+def user_scores(user_cpu: str, user_gpu: str, user_ram: str, rankings: Optional[Rankings] = None) -> Tuple[int, int, int]:
+    """Resolve user specs to (cpu score, gpu score, RAM in GB). Missing specs count as 0."""
+    rankings = rankings or get_rankings()
+    cpu_score = get_cpu_score(user_cpu, rankings) if user_cpu else 0
+    gpu_score = get_gpu_score(user_gpu, rankings) if user_gpu else 0
+    ram_gb = int(user_ram) if user_ram.isdigit() else 0
+    return cpu_score, gpu_score, ram_gb
+
+def check_scores(cpu_score: int, gpu_score: int, ram_gb: int, scores: Dict[str, Any]) -> CompareResult:
+    """
+    Compare resolved user specs against requirement scores. Missing requirements
+    are met; missing recommended ones fall back to the minimum check; a RAM
+    requirement whose amount couldn't be parsed is never met.
+    """
+    cpu_min = not scores["min_cpu"] or cpu_score >= scores["min_cpu_score"]
+    cpu_rec = cpu_score >= scores["rec_cpu_score"] if scores["rec_cpu"] else cpu_min
+    gpu_min = not scores["min_gpu"] or gpu_score >= scores["min_gpu_score"]
+    gpu_rec = gpu_score >= scores["rec_gpu_score"] if scores["rec_gpu"] else gpu_min
+    ram_min = not scores["min_ram"] or bool(scores["min_ram_gb"]) and ram_gb >= scores["min_ram_gb"]
+    ram_rec = bool(scores["rec_ram_gb"]) and ram_gb >= scores["rec_ram_gb"] if scores["rec_ram"] else ram_min
+    return CompareResult(scores["ranking_version"], cpu_score, gpu_score, ram_gb,
+                         cpu_min, cpu_rec, gpu_min, gpu_rec, ram_min, ram_rec)
+
+# (recommended, minimum, insufficient) messages per component
+_MESSAGES = {
+    "cpu": ("Seu CPU ({}) atende aos requisitos recomendados!",
+            "Seu CPU ({}) atende aos requisitos mínimos.",
+            "Seu CPU ({}) está abaixo dos requisitos mínimos."),
+    "gpu": ("Sua GPU ({}) atende aos requisitos recomendados!",
+            "Sua GPU ({}) atende aos requisitos mínimos.",
+            "Sua GPU ({}) está abaixo dos requisitos mínimos."),
+    "ram": ("Sua RAM ({}) atende aos requisitos recomendados!",
+            "Sua RAM ({}) atende aos requisitos mínimos.",
+            "Sua RAM ({}) está abaixo dos requisitos mínimos."),
+}
+
+def _status(component: str, label: str, meets_min: bool, meets_rec: bool) -> Dict[str, Any]:
+    recommended, minimum, insufficient = _MESSAGES[component]
+    if meets_rec:
+        return {"status": "excellent", "message": recommended.format(label)}
+    if meets_min:
+        return {"status": "good", "message": minimum.format(label)}
+    return {"status": "insufficient", "message": insufficient.format(label)}
+
+def _hardware_details(component: str, user_spec: str, user_score: int, user_match: Tuple[Optional[str], float],
+                      meets_min: bool, meets_rec: bool, scores: Dict[str, Any]) -> Dict[str, Any]:
+    details = _status(component, user_spec, meets_min, meets_rec)
+    for level in ("min", "rec"):
+        key = f"{level}_{component}"
+        if scores[key]:
+            details[f"{level}_required"] = scores[key]
+            details[f"{level}_score"] = scores[key + "_score"]
+            details[f"{level}_match"] = {"model": scores[key + "_model"], "confidence": scores[key + "_confidence"]}
+    details["user_score"] = user_score
+    details["user_match"] = {"model": user_match[0], "confidence": user_match[1]}
+    details["meets_minimum"] = meets_min
+    details["meets_recommended"] = meets_rec
+    return details
+
+def describe(result: CompareResult, user_cpu: str, user_gpu: str, scores: Dict[str, Any],
+             rankings: Optional[Rankings] = None) -> Dict[str, Any]:
+    """Full comparison results (details and messages) in the CompareResponse shape."""
+    rankings = rankings or get_rankings()
+    cpu_match = resolve_cpu(user_cpu, rankings)[1:] if user_cpu else (None, 0.0)
+    gpu_match = resolve_gpu(user_gpu, rankings)[1:] if user_gpu else (None, 0.0)
+
+    ram = _status("ram", f"{result.ram_gb} GB", result.ram_min, result.ram_rec)
+    for level in ("min", "rec"):
+        if scores[f"{level}_ram"] and scores[f"{level}_ram_gb"]:
+            ram[f"{level}_required"] = f"{scores[f'{level}_ram_gb']} GB"
+    ram["user_amount"] = f"{result.ram_gb} GB"
+    ram["meets_minimum"] = result.ram_min
+    ram["meets_recommended"] = result.ram_rec
+
+    return {
+        "can_run_minimum": result.can_run_minimum,
+        "can_run_recommended": result.can_run_recommended,
+        "ranking_version": result.ranking_version,
         "details": {
-            "cpu": {"status": "unknown", "message": ""},
-            "gpu": {"status": "unknown", "message": ""},
-            "ram": {"status": "unknown", "message": ""}
+            "cpu": _hardware_details("cpu", user_cpu, result.cpu_score, cpu_match,
+                                     result.cpu_min, result.cpu_rec, scores),
+            "gpu": _hardware_details("gpu", user_gpu, result.gpu_score, gpu_match,
+                                     result.gpu_min, result.gpu_rec, scores),
+            "ram": ram,
         }
     }
-    
-    # Parse user specs
-    user_cpu_score = get_cpu_score(user_cpu) if user_cpu else 0
-    user_gpu_score = get_gpu_score(user_gpu) if user_gpu else 0
-    user_ram_gb = int(user_ram) if user_ram.isdigit() else 0
-    
-    # Check CPU
-    cpu_meets_min = False
-    cpu_meets_rec = False
-    
-    if min_cpu:
-        min_cpu_score = get_cpu_score(min_cpu)
-        cpu_meets_min = user_cpu_score >= min_cpu_score
-        result["details"]["cpu"]["min_required"] = min_cpu
-        result["details"]["cpu"]["min_score"] = min_cpu_score
-    else:
-        cpu_meets_min = True  # No requirement specified
-    
-    if rec_cpu:
-        rec_cpu_score = get_cpu_score(rec_cpu)
-        cpu_meets_rec = user_cpu_score >= rec_cpu_score
-        result["details"]["cpu"]["rec_required"] = rec_cpu
-        result["details"]["cpu"]["rec_score"] = rec_cpu_score
-    else:
-        cpu_meets_rec = cpu_meets_min  # If no rec, use min
-    
-    result["details"]["cpu"]["user_score"] = user_cpu_score
-    result["details"]["cpu"]["meets_minimum"] = cpu_meets_min
-    result["details"]["cpu"]["meets_recommended"] = cpu_meets_rec
-    
-    if cpu_meets_rec:
-        result["details"]["cpu"]["status"] = "excellent"
-        result["details"]["cpu"]["message"] = f"Seu CPU ({user_cpu}) atende aos requisitos recomendados!"
-    elif cpu_meets_min:
-        result["details"]["cpu"]["status"] = "good"
-        result["details"]["cpu"]["message"] = f"Seu CPU ({user_cpu}) atende aos requisitos mínimos."
-    else:
-        result["details"]["cpu"]["status"] = "insufficient"
-        result["details"]["cpu"]["message"] = f"Seu CPU ({user_cpu}) está abaixo dos requisitos mínimos."
-    
-    # Check GPU
-    gpu_meets_min = False
-    gpu_meets_rec = False
-    
-    if min_gpu:
-        min_gpu_score = get_gpu_score(min_gpu)
-        gpu_meets_min = user_gpu_score >= min_gpu_score
-        result["details"]["gpu"]["min_required"] = min_gpu
-        result["details"]["gpu"]["min_score"] = min_gpu_score
-    else:
-        gpu_meets_min = True
-    
-    if rec_gpu:
-        rec_gpu_score = get_gpu_score(rec_gpu)
-        gpu_meets_rec = user_gpu_score >= rec_gpu_score
-        result["details"]["gpu"]["rec_required"] = rec_gpu
-        result["details"]["gpu"]["rec_score"] = rec_gpu_score
-    else:
-        gpu_meets_rec = gpu_meets_min
-    
-    result["details"]["gpu"]["user_score"] = user_gpu_score
-    result["details"]["gpu"]["meets_minimum"] = gpu_meets_min
-    result["details"]["gpu"]["meets_recommended"] = gpu_meets_rec
-    
-    if gpu_meets_rec:
-        result["details"]["gpu"]["status"] = "excellent"
-        result["details"]["gpu"]["message"] = f"Sua GPU ({user_gpu}) atende aos requisitos recomendados!"
-    elif gpu_meets_min:
-        result["details"]["gpu"]["status"] = "good"
-        result["details"]["gpu"]["message"] = f"Sua GPU ({user_gpu}) atende aos requisitos mínimos."
-    else:
-        result["details"]["gpu"]["status"] = "insufficient"
-        result["details"]["gpu"]["message"] = f"Sua GPU ({user_gpu}) está abaixo dos requisitos mínimos."
-    
-    # Check RAM
-    ram_meets_min = False
-    ram_meets_rec = False
-    
-    if min_ram:
-        min_ram_gb = extract_ram_gb(min_ram)
-        if min_ram_gb:
-            ram_meets_min = user_ram_gb >= min_ram_gb
-            result["details"]["ram"]["min_required"] = f"{min_ram_gb} GB"
-    else:
-        ram_meets_min = True
-    
-    if rec_ram:
-        rec_ram_gb = extract_ram_gb(rec_ram)
-        if rec_ram_gb:
-            ram_meets_rec = user_ram_gb >= rec_ram_gb
-            result["details"]["ram"]["rec_required"] = f"{rec_ram_gb} GB"
-    else:
-        ram_meets_rec = ram_meets_min
-    
-    result["details"]["ram"]["user_amount"] = f"{user_ram_gb} GB"
-    result["details"]["ram"]["meets_minimum"] = ram_meets_min
-    result["details"]["ram"]["meets_recommended"] = ram_meets_rec
-    
-    if ram_meets_rec:
-        result["details"]["ram"]["status"] = "excellent"
-        result["details"]["ram"]["message"] = f"Sua RAM ({user_ram_gb} GB) atende aos requisitos recomendados!"
-    elif ram_meets_min:
-        result["details"]["ram"]["status"] = "good"
-        result["details"]["ram"]["message"] = f"Sua RAM ({user_ram_gb} GB) atende aos requisitos mínimos."
-    else:
-        result["details"]["ram"]["status"] = "insufficient"
-        result["details"]["ram"]["message"] = f"Sua RAM ({user_ram_gb} GB) está abaixo dos requisitos mínimos."
-    
-    # Overall results
-    result["can_run_minimum"] = cpu_meets_min and gpu_meets_min and ram_meets_min
-    result["can_run_recommended"] = cpu_meets_rec and gpu_meets_rec and ram_meets_rec
-    
-    return result
+
+def compare_specs(
+    user_cpu: str,
+    user_gpu: str,
+    user_ram: str,
+    min_cpu: Optional[str] = None,
+    min_gpu: Optional[str] = None,
+    min_ram: Optional[str] = None,
+    rec_cpu: Optional[str] = None,
+    rec_gpu: Optional[str] = None,
+    rec_ram: Optional[str] = None,
+    scores: Optional[Dict[str, Any]] = None
+) -> Dict:
+    """
+    Compare user specs against game requirements.
+    Requirements are given either as strings or as precomputed `scores`
+    (see score_requirements). Returns detailed comparison results; callers
+    that only need the flags should use check_scores directly.
+    """
+    # Use one rankings snapshot for the whole comparison
+    rankings = get_rankings()
+    if scores is None:
+        scores = score_requirements(min_cpu, min_gpu, min_ram, rec_cpu, rec_gpu, rec_ram, rankings)
+    result = check_scores(*user_scores(user_cpu, user_gpu, user_ram, rankings), scores)
+    return describe(result, user_cpu, user_gpu, scores, rankings)
@@ -3,9 +3,65 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+def _admission_class(name: str, prefixes: list, concurrency: int, queue: int, queue_timeout: float, deadline: float) -> dict:
+    """Limits of one admission route class, overridable with ADMISSION_<NAME>_* variables."""
+    env = f"ADMISSION_{name.upper()}_"
+    return {
+        "name": name,
+        "prefixes": prefixes,
+        "max_concurrency": int(os.getenv(env + "CONCURRENCY", str(concurrency))),
+        "max_queue": int(os.getenv(env + "QUEUE", str(queue))),
+        "queue_timeout": float(os.getenv(env + "QUEUE_TIMEOUT", str(queue_timeout))),
+        "deadline": float(os.getenv(env + "DEADLINE", str(deadline))),
+    }
+
 class Settings:
     RAWG_API_KEY: str = os.getenv("RAWG_API_KEY", "")
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379")
+    REDIS_MAX_CONNECTIONS: int = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+    REDIS_SOCKET_TIMEOUT: float = float(os.getenv("REDIS_SOCKET_TIMEOUT", "1.0"))
+    REDIS_HEALTH_CHECK_INTERVAL: int = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))
     ALLOWED_ORIGINS: list = os.getenv("ALLOWED_ORIGINS", "http://localhost:3000,http://localhost:5173").split(",")
 
+    # Max concurrent RAWG requests made by one batch request
+    RAWG_MAX_CONCURRENCY: int = int(os.getenv("RAWG_MAX_CONCURRENCY", "8"))
+
+    # Favorites whose requirements couldn't be fetched are retried after this many seconds
+    COMPAT_RETRY_INTERVAL: int = int(os.getenv("COMPAT_RETRY_INTERVAL", "3600"))
+
+    # Local game catalog: /search only falls back to RAWG below this many local hits
+    CATALOG_MIN_HITS: int = int(os.getenv("CATALOG_MIN_HITS", "3"))
+
+    # In-process /search result cache; the most frequent prefixes (tracked with a
+    # Space-Saving sketch) get deeper match lists refreshed every SEARCH_WARM_INTERVAL seconds
+    SEARCH_CACHE_TTL: float = float(os.getenv("SEARCH_CACHE_TTL", "60"))
+    SEARCH_CACHE_SIZE: int = int(os.getenv("SEARCH_CACHE_SIZE", "4096"))
+    SEARCH_SKETCH_CAPACITY: int = int(os.getenv("SEARCH_SKETCH_CAPACITY", "512"))
+    SEARCH_WARM_TOP: int = int(os.getenv("SEARCH_WARM_TOP", "32"))
+    SEARCH_WARM_INTERVAL: float = float(os.getenv("SEARCH_WARM_INTERVAL", "30"))
+    SEARCH_PREFIX_DEPTH: int = int(os.getenv("SEARCH_PREFIX_DEPTH", "200"))
+
+    # Incremental catalog sync (python -m app.services.catalog_sync)
+    CATALOG_SYNC_CONCURRENCY: int = int(os.getenv("CATALOG_SYNC_CONCURRENCY", "8"))
+    CATALOG_SYNC_PAGE_SIZE: int = int(os.getenv("CATALOG_SYNC_PAGE_SIZE", "40"))
+    CATALOG_SYNC_MAX_PAGES: int = int(os.getenv("CATALOG_SYNC_MAX_PAGES", "50"))
+    # Games whose details failed are retried by the next runs, this many per run, up to MAX_ATTEMPTS times
+    CATALOG_SYNC_RETRY_BATCH: int = int(os.getenv("CATALOG_SYNC_RETRY_BATCH", "200"))
+    CATALOG_SYNC_MAX_ATTEMPTS: int = int(os.getenv("CATALOG_SYNC_MAX_ATTEMPTS", "5"))
+
+    # Hardware ranking data, re-read when the file changes (checked every RANKINGS_RELOAD_INTERVAL seconds)
+    HARDWARE_RANKINGS_PATH: str = os.getenv(
+        "HARDWARE_RANKINGS_PATH",
+        os.path.join(os.path.dirname(__file__), '..', 'data', 'hardware_rankings.json')
+    )
+    RANKINGS_RELOAD_INTERVAL: float = float(os.getenv("RANKINGS_RELOAD_INTERVAL", "30"))
+
+    # Admission control for upstream-bound routes (local routes are never limited)
+    ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+    ADMISSION_RETRY_AFTER: int = int(os.getenv("ADMISSION_RETRY_AFTER", "2"))
+    ADMISSION_CLASSES: list = [
+        _admission_class("upstream", ["/api/game", "/api/games", "/api/compare"], 32, 64, 2.0, 20.0),
+        _admission_class("search", ["/api/search"], 64, 128, 0.5, 5.0),
+    ]
+
 settings = Settings()
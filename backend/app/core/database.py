@@ -5,6 +5,30 @@ from typing import Optional, List, Dict, Any
 
 DATABASE_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'gamesphere.db')
 
+GAME_REQUIREMENTS_FIELDS = (
+    "game_id", "ranking_version",
+    "min_cpu", "min_cpu_score", "min_cpu_model", "min_cpu_confidence",
+    "min_gpu", "min_gpu_score", "min_gpu_model", "min_gpu_confidence",
+    "min_ram", "min_ram_gb",
+    "rec_cpu", "rec_cpu_score", "rec_cpu_model", "rec_cpu_confidence",
+    "rec_gpu", "rec_gpu_score", "rec_gpu_model", "rec_gpu_confidence",
+    "rec_ram", "rec_ram_gb",
+)
+
+# A level is met when every requirement is absent or its score is reached;
+# a RAM requirement whose amount couldn't be parsed is never met.
+_MEETS_MINIMUM_SQL = '''
+    (min_cpu IS NULL OR min_cpu_score <= :cpu)
+    AND (min_gpu IS NULL OR min_gpu_score <= :gpu)
+    AND (min_ram IS NULL OR min_ram_gb <= :ram)
+'''
+# Recommended falls back to the minimum check for each missing component
+_MEETS_RECOMMENDED_SQL = '''
+    (CASE WHEN rec_cpu IS NULL THEN (min_cpu IS NULL OR min_cpu_score <= :cpu) ELSE rec_cpu_score <= :cpu END)
+    AND (CASE WHEN rec_gpu IS NULL THEN (min_gpu IS NULL OR min_gpu_score <= :gpu) ELSE rec_gpu_score <= :gpu END)
+    AND (CASE WHEN rec_ram IS NULL THEN (min_ram IS NULL OR min_ram_gb <= :ram) ELSE rec_ram_gb <= :ram END)
+'''
+
 def get_db_connection():
     """Get a database connection."""
     conn = sqlite3.connect(DATABASE_PATH)
@@ -42,6 +66,89 @@ def init_database():
         )
     ''')
     
+    # Create rig profiles table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS rig_profiles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            cpu TEXT NOT NULL,
+            gpu TEXT NOT NULL,
+            ram TEXT NOT NULL,
+            is_default INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_rig_profiles_user ON rig_profiles (user_id)')
+    
+    # Create precomputed compatibility table (one row per rig and favorited game)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS favorite_compatibility (
+            rig_id INTEGER NOT NULL,
+            game_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            ranking_version TEXT NOT NULL,
+            can_run_minimum INTEGER NOT NULL,
+            can_run_recommended INTEGER NOT NULL,
+            computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            failed_at TIMESTAMP,
+            PRIMARY KEY (rig_id, game_id),
+            FOREIGN KEY (rig_id) REFERENCES rig_profiles (id) ON DELETE CASCADE
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_favorite_compatibility_user ON favorite_compatibility (user_id, game_id)')
+    # Tables created before failure markers existed
+    columns = [row[1] for row in cursor.execute('PRAGMA table_info(favorite_compatibility)')]
+    if "failed_at" not in columns:
+        cursor.execute('ALTER TABLE favorite_compatibility ADD COLUMN failed_at TIMESTAMP')
+    
+    # Create resolved requirement scores table (one row per game and ranking data version)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS game_requirements (
+            game_id INTEGER NOT NULL,
+            ranking_version TEXT NOT NULL,
+            min_cpu TEXT,
+            min_cpu_score INTEGER,
+            min_cpu_model TEXT,
+            min_cpu_confidence REAL,
+            min_gpu TEXT,
+            min_gpu_score INTEGER,
+            min_gpu_model TEXT,
+            min_gpu_confidence REAL,
+            min_ram TEXT,
+            min_ram_gb INTEGER,
+            rec_cpu TEXT,
+            rec_cpu_score INTEGER,
+            rec_cpu_model TEXT,
+            rec_cpu_confidence REAL,
+            rec_gpu TEXT,
+            rec_gpu_score INTEGER,
+            rec_gpu_model TEXT,
+            rec_gpu_confidence REAL,
+            rec_ram TEXT,
+            rec_ram_gb INTEGER,
+            computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (game_id, ranking_version)
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_game_requirements_min
+        ON game_requirements (ranking_version, min_gpu_score, min_cpu_score, min_ram_gb)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_game_requirements_rec
+        ON game_requirements (ranking_version, rec_gpu_score, rec_cpu_score, rec_ram_gb)
+    ''')
+    
+    # Per-user counter bumped on every change to the favorites list (used as its ETag)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS favorites_versions (
+            user_id INTEGER PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    
     conn.commit()
     conn.close()
     print(f"Database initialized at {DATABASE_PATH}")
@@ -100,6 +207,22 @@ def get_user_by_id(user_id: int) -> Optional[Dict[str, Any]]:
     return None
 
 # Favorites operations
+def _bump_favorites_version(cursor, user_id: int):
+    cursor.execute(
+        '''INSERT INTO favorites_versions (user_id, version) VALUES (?, 1)
+           ON CONFLICT(user_id) DO UPDATE SET version = version + 1''',
+        (user_id,)
+    )
+
+def get_favorites_version(user_id: int) -> int:
+    """Get the version counter of a user's favorites list."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('SELECT version FROM favorites_versions WHERE user_id = ?', (user_id,))
+    row = cursor.fetchone()
+    conn.close()
+    return row[0] if row else 0
+
 def add_favorite(user_id: int, game_id: int, game_name: str, game_image: Optional[str] = None, game_rating: Optional[float] = None) -> bool:
     """Add a game to user's favorites."""
     try:
@@ -109,6 +232,7 @@ def add_favorite(user_id: int, game_id: int, game_name: str, game_image: Optiona
             'INSERT INTO favorites (user_id, game_id, game_name, game_image, game_rating) VALUES (?, ?, ?, ?, ?)',
             (user_id, game_id, game_name, game_image, game_rating)
         )
+        _bump_favorites_version(cursor, user_id)
         conn.commit()
         conn.close()
         return True
@@ -124,6 +248,12 @@ def remove_favorite(user_id: int, game_id: int) -> bool:
         (user_id, game_id)
     )
     deleted = cursor.rowcount > 0
+    cursor.execute(
+        'DELETE FROM favorite_compatibility WHERE user_id = ? AND game_id = ?',
+        (user_id, game_id)
+    )
+    if deleted:
+        _bump_favorites_version(cursor, user_id)
     conn.commit()
     conn.close()
     return deleted
@@ -152,3 +282,245 @@ def is_favorite(user_id: int, game_id: int) -> bool:
     exists = cursor.fetchone() is not None
     conn.close()
     return exists
+
+
+# Rig profile operations
+def create_rig_profile(user_id: int, name: str, cpu: str, gpu: str, ram: str, is_default: bool = False) -> int:
+    """Create a rig profile and return its ID. The user's first rig becomes the default."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('SELECT 1 FROM rig_profiles WHERE user_id = ?', (user_id,))
+    if cursor.fetchone() is None:
+        is_default = True
+    if is_default:
+        cursor.execute('UPDATE rig_profiles SET is_default = 0 WHERE user_id = ?', (user_id,))
+    cursor.execute(
+        'INSERT INTO rig_profiles (user_id, name, cpu, gpu, ram, is_default) VALUES (?, ?, ?, ?, ?, ?)',
+        (user_id, name, cpu, gpu, ram, int(is_default))
+    )
+    rig_id = cursor.lastrowid
+    _bump_favorites_version(cursor, user_id)
+    conn.commit()
+    conn.close()
+    return rig_id
+
+def get_user_rigs(user_id: int) -> List[Dict[str, Any]]:
+    """Get all rig profiles of a user, default first."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        'SELECT * FROM rig_profiles WHERE user_id = ? ORDER BY is_default DESC, id',
+        (user_id,)
+    )
+    rows = cursor.fetchall()
+    conn.close()
+    
+    return [dict(row) for row in rows]
+
+def get_rig_profile(user_id: int, rig_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Get one of the user's rig profiles, or the default one if rig_id is None."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    if rig_id is None:
+        cursor.execute(
+            'SELECT * FROM rig_profiles WHERE user_id = ? ORDER BY is_default DESC, id LIMIT 1',
+            (user_id,)
+        )
+    else:
+        cursor.execute('SELECT * FROM rig_profiles WHERE user_id = ? AND id = ?', (user_id, rig_id))
+    row = cursor.fetchone()
+    conn.close()
+    
+    if row:
+        return dict(row)
+    return None
+
+def update_rig_profile(user_id: int, rig_id: int, name: str, cpu: str, gpu: str, ram: str, is_default: bool = False) -> bool:
+    """Update a rig profile. Its stored compatibility results are dropped."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    if is_default:
+        cursor.execute('UPDATE rig_profiles SET is_default = 0 WHERE user_id = ?', (user_id,))
+    cursor.execute(
+        '''UPDATE rig_profiles SET name = ?, cpu = ?, gpu = ?, ram = ?,
+               is_default = MAX(is_default, ?), updated_at = CURRENT_TIMESTAMP
+           WHERE user_id = ? AND id = ?''',
+        (name, cpu, gpu, ram, int(is_default), user_id, rig_id)
+    )
+    updated = cursor.rowcount > 0
+    if updated:
+        cursor.execute('DELETE FROM favorite_compatibility WHERE rig_id = ?', (rig_id,))
+        _bump_favorites_version(cursor, user_id)
+        conn.commit()
+    else:
+        conn.rollback()
+    conn.close()
+    return updated
+
+def delete_rig_profile(user_id: int, rig_id: int) -> bool:
+    """Delete a rig profile and its compatibility results."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('DELETE FROM rig_profiles WHERE user_id = ? AND id = ?', (user_id, rig_id))
+    deleted = cursor.rowcount > 0
+    if deleted:
+        cursor.execute('DELETE FROM favorite_compatibility WHERE rig_id = ?', (rig_id,))
+        _bump_favorites_version(cursor, user_id)
+    conn.commit()
+    conn.close()
+    return deleted
+
+# Compatibility operations
+def save_compatibility(rows: List[Dict[str, Any]]):
+    """
+    Store compatibility results (rig_id, game_id, user_id, ranking_version,
+    can_run_minimum, can_run_recommended, failed). Rows with `failed` set mark
+    games whose requirements couldn't be loaded; their flags are meaningless.
+    """
+    if not rows:
+        return
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.executemany(
+        '''INSERT INTO favorite_compatibility
+               (rig_id, game_id, user_id, ranking_version, can_run_minimum, can_run_recommended, failed_at)
+           VALUES (:rig_id, :game_id, :user_id, :ranking_version, :can_run_minimum, :can_run_recommended,
+                   CASE WHEN :failed THEN CURRENT_TIMESTAMP END)
+           ON CONFLICT(rig_id, game_id) DO UPDATE SET
+               ranking_version = excluded.ranking_version,
+               can_run_minimum = excluded.can_run_minimum,
+               can_run_recommended = excluded.can_run_recommended,
+               computed_at = CURRENT_TIMESTAMP,
+               failed_at = excluded.failed_at''',
+        [dict(row, failed=int(row.get("failed", False))) for row in rows]
+    )
+    for user_id in {row["user_id"] for row in rows}:
+        _bump_favorites_version(cursor, user_id)
+    conn.commit()
+    conn.close()
+
+def get_favorites_with_compatibility(user_id: int, rig_id: int, retry_after: int) -> List[Dict[str, Any]]:
+    """
+    Get all favorites of a user with the stored compatibility for one rig (NULL
+    columns if not computed). `failed` is set for failure markers and
+    `retry_due` once such a marker is older than retry_after seconds.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        '''SELECT f.game_id, f.game_name, f.game_image, f.game_rating, f.created_at,
+                  c.ranking_version, c.can_run_minimum, c.can_run_recommended,
+                  c.failed_at IS NOT NULL AS failed,
+                  c.failed_at IS NOT NULL AND c.failed_at < datetime('now', ?) AS retry_due
+           FROM favorites f
+           LEFT JOIN favorite_compatibility c ON c.rig_id = ? AND c.game_id = f.game_id
+           WHERE f.user_id = ?
+           ORDER BY f.created_at DESC''',
+        (f"-{retry_after} seconds", rig_id, user_id)
+    )
+    rows = cursor.fetchall()
+    conn.close()
+    
+    return [dict(row) for row in rows]
+
+def get_due_compatibility_retries(user_id: int, rig_id: int, retry_after: int) -> List[int]:
+    """Favorite game ids of a user whose failure marker for a rig is older than retry_after seconds."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        '''SELECT c.game_id
+           FROM favorite_compatibility c
+           JOIN favorites f ON f.user_id = ? AND f.game_id = c.game_id
+           WHERE c.rig_id = ? AND c.failed_at < datetime('now', ?)''',
+        (user_id, rig_id, f"-{retry_after} seconds")
+    )
+    rows = cursor.fetchall()
+    conn.close()
+    return [row[0] for row in rows]
+
+# Requirement score operations
+def save_game_requirements(rows: List[Dict[str, Any]]):
+    """Store resolved requirement scores, replacing rows of the same game and ranking version."""
+    if not rows:
+        return
+    conn = get_db_connection()
+    conn.executemany(
+        f'''INSERT OR REPLACE INTO game_requirements ({", ".join(GAME_REQUIREMENTS_FIELDS)})
+            VALUES ({", ".join(":" + f for f in GAME_REQUIREMENTS_FIELDS)})''',
+        rows
+    )
+    conn.commit()
+    conn.close()
+
+def get_game_requirements(game_ids: List[int], ranking_version: str) -> Dict[int, Dict[str, Any]]:
+    """Get stored requirement scores of several games for one ranking version, by game id."""
+    if not game_ids:
+        return {}
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        f'''SELECT {", ".join(GAME_REQUIREMENTS_FIELDS)} FROM game_requirements
+            WHERE ranking_version = ? AND game_id IN ({", ".join("?" for _ in game_ids)})''',
+        (ranking_version, *game_ids)
+    )
+    rows = cursor.fetchall()
+    conn.close()
+    
+    return {row["game_id"]: dict(row) for row in rows}
+
+def get_requirements_to_score(ranking_version: str, limit: int = 500) -> List[Dict[str, Any]]:
+    """Parsed catalog requirements of games that have no scores for this ranking version yet."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        '''SELECT c.game_id, c.parsed_min, c.parsed_rec
+           FROM catalog_requirements c
+           LEFT JOIN game_requirements g ON g.game_id = c.game_id AND g.ranking_version = ?
+           WHERE g.game_id IS NULL
+           LIMIT ?''',
+        (ranking_version, limit)
+    )
+    rows = cursor.fetchall()
+    conn.close()
+    
+    return [dict(row) for row in rows]
+
+def delete_game_requirements_except(ranking_version: str) -> int:
+    """Drop scores computed with other ranking versions."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('DELETE FROM game_requirements WHERE ranking_version != ?', (ranking_version,))
+    deleted = cursor.rowcount
+    conn.commit()
+    conn.close()
+    return deleted
+
+def filter_runnable_games(
+    ranking_version: str,
+    cpu_score: int,
+    gpu_score: int,
+    ram_gb: int,
+    recommended: bool = False,
+    game_ids: Optional[List[int]] = None
+) -> List[int]:
+    """Ids of the games (optionally among game_ids) whose minimum or recommended requirements a rig meets."""
+    params: Dict[str, Any] = {"version": ranking_version, "cpu": cpu_score, "gpu": gpu_score, "ram": ram_gb}
+    query = f'''SELECT game_id FROM game_requirements
+                WHERE ranking_version = :version
+                AND {_MEETS_RECOMMENDED_SQL if recommended else _MEETS_MINIMUM_SQL}'''
+    if game_ids is not None:
+        if not game_ids:
+            return []
+        placeholders = []
+        for i, game_id in enumerate(game_ids):
+            params[f"g{i}"] = game_id
+            placeholders.append(f":g{i}")
+        query += f" AND game_id IN ({', '.join(placeholders)})"
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    conn.close()
+    
+    return [row[0] for row in rows]
@@ -0,0 +1,45 @@
+import hashlib
+from typing import Optional, Dict
+from fastapi import Response
+
+# Cache-Control per route class
+GAME_CACHE_CONTROL = "public, max-age=300"
+SEARCH_CACHE_CONTROL = "public, max-age=60"
+FAVORITES_CACHE_CONTROL = "private, no-cache"
+
+def make_etag(body: str) -> str:
+    """Strong ETag for a response body."""
+    return '"' + hashlib.sha1(body.encode('utf-8')).hexdigest() + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires for this header)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+def validator_headers(etag: str, cache_control: str, vary: Optional[str] = None) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if vary:
+        headers["Vary"] = vary
+    return headers
+
+def not_modified(etag: str, cache_control: str, vary: Optional[str] = None) -> Response:
+    """Empty 304 response carrying the same validators as the full one."""
+    return Response(status_code=304, headers=validator_headers(etag, cache_control, vary))
+
+def json_response(body: str, etag: str, cache_control: str, vary: Optional[str] = None) -> Response:
+    """Already-serialized JSON body with its validators."""
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers=validator_headers(etag, cache_control, vary)
+    )
@@ -1,6 +1,16 @@
 import re
+from typing import Dict, Any
 from app.models.schemas import ParsedRequirements
 
+def extract_pc_requirements(game_data: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Returns the raw PC requirements ({"minimum": ..., "recommended": ...}) of a RAWG game payload.
+    """
+    for p in game_data.get("platforms") or []:
+        if p.get("platform", {}).get("slug") == "pc":
+            return p.get("requirements") or {}
+    return {}
+
 def parse_requirements(text: str) -> ParsedRequirements:
     """
     Parses unstructured system requirements text to extract CPU, GPU, RAM, Storage, and OS.
@@ -0,0 +1,139 @@
+import os
+import re
+import json
+import time
+import threading
+from array import array
+from functools import lru_cache
+from typing import Optional, List, Dict, Tuple, Any, Callable
+
+from app.core.config import settings
+from app.core.trigram import TrigramIndex
+
+# Fuzzy matches below this similarity are treated as unknown hardware
+FUZZY_MIN_CONFIDENCE = 0.6
+
+class RankingTable:
+    """
+    Precompiled lookup over one hardware class (CPUs or GPUs).
+
+    Keys are kept longest-first, so "rtx 3060 ti" wins over "rtx 3060", and
+    matched with a single compiled alternation instead of one substring test
+    per key. A key may not be followed by another digit ("rx 560" does not
+    match "rx 5600"). Names no key matches are resolved through a trigram
+    index; resolutions are memoized per table.
+    """
+    __slots__ = ("keys", "scores", "_pattern", "_index", "_trigrams", "resolve")
+
+    def __init__(self, entries: List[Dict[str, Any]]):
+        ordered = sorted(entries, key=lambda e: len(e["name"]), reverse=True)
+        self.keys: Tuple[str, ...] = tuple(e["name"].lower() for e in ordered)
+        self.scores = array('H', (int(e["score"]) for e in ordered))
+        self._index = {key: i for i, key in enumerate(self.keys)}
+        self._pattern = re.compile("|".join(re.escape(k) + r"(?!\d)" for k in self.keys))
+        self._trigrams = TrigramIndex(self.keys)
+        self.resolve = lru_cache(maxsize=4096)(self._resolve)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def lookup(self, normalized: str) -> Optional[Tuple[str, int]]:
+        """Find the first known model mentioned in a normalized name. Returns (key, score)."""
+        match = self._pattern.search(normalized)
+        if not match:
+            return None
+        key = match.group(0)
+        return key, self.scores[self._index[key]]
+
+    def _resolve(self, normalized: str) -> Optional[Tuple[str, int, float]]:
+        """
+        Resolve a normalized name to (key, score, confidence). Exact mentions have
+        confidence 1.0, fuzzy matches their trigram similarity. None if unknown.
+        """
+        found = self.lookup(normalized)
+        if found:
+            return found[0], found[1], 1.0
+
+        match = self._trigrams.search(normalized)
+        if match and match[1] >= FUZZY_MIN_CONFIDENCE:
+            i, confidence = match
+            return self.keys[i], self.scores[i], round(confidence, 2)
+        return None
+
+class Rankings:
+    """
+    One immutable, versioned snapshot of the hardware ranking data.
+    Unknown hardware gets `default_score`, which must stay below every listed
+    model: an unrecognized user part never outranks a known one, and an
+    unrecognized requirement doesn't fail known hardware.
+    """
+    __slots__ = ("version", "default_score", "gpu", "cpu")
+
+    def __init__(self, data: Dict[str, Any]):
+        self.version: str = str(data["version"])
+        self.default_score: int = int(data.get("default_score", 50))
+        self.gpu = RankingTable(data["gpus"])
+        self.cpu = RankingTable(data["cpus"])
+        lowest = min([*self.gpu.scores, *self.cpu.scores], default=None)
+        if lowest is not None and self.default_score >= lowest:
+            raise ValueError(f"default_score {self.default_score} must be below the lowest listed score ({lowest})")
+
+def load_rankings(path: str) -> Rankings:
+    """Load and compile a rankings data file."""
+    with open(path, encoding='utf-8') as f:
+        return Rankings(json.load(f))
+
+_current: Optional[Rankings] = None
+_loaded_mtime: Optional[float] = None
+_last_check = 0.0
+_lock = threading.Lock()
+_listeners: List[Callable[[Rankings], None]] = []
+
+def add_reload_listener(listener: Callable[[Rankings], None]):
+    """Call `listener(rankings)` whenever a new ranking version replaces the current one."""
+    _listeners.append(listener)
+
+def reload_rankings(force: bool = False) -> Rankings:
+    """
+    Reload the data file if it changed on disk (or if forced). The new snapshot
+    replaces the old one in a single assignment, so readers always see a complete
+    table. A broken file is reported and the current snapshot is kept.
+    """
+    global _current, _loaded_mtime, _last_check
+    replaced = None
+    with _lock:
+        _last_check = time.monotonic()
+        path = settings.HARDWARE_RANKINGS_PATH
+        mtime = None
+        try:
+            mtime = os.path.getmtime(path)
+            if force or _current is None or mtime != _loaded_mtime:
+                rankings = load_rankings(path)
+                if _current is None or rankings.version != _current.version:
+                    print(f"Hardware rankings {rankings.version} loaded: {len(rankings.cpu)} CPUs, {len(rankings.gpu)} GPUs")
+                    if _current is not None:
+                        replaced = rankings
+                _current = rankings
+                _loaded_mtime = mtime
+        except Exception as e:
+            if _current is None:
+                raise
+            # Don't retry the same broken file on every check
+            _loaded_mtime = mtime
+            print(f"Failed to reload hardware rankings, keeping {_current.version}: {e}")
+        current = _current
+
+    # Listeners run outside the lock so they may read the new snapshot
+    if replaced is not None:
+        for listener in _listeners:
+            try:
+                listener(replaced)
+            except Exception as e:
+                print(f"Rankings reload listener failed: {e}")
+    return current
+
+def get_rankings() -> Rankings:
+    """Current rankings snapshot. The data file is re-checked at most every RANKINGS_RELOAD_INTERVAL seconds."""
+    if _current is None or time.monotonic() - _last_check > settings.RANKINGS_RELOAD_INTERVAL:
+        return reload_rankings()
+    return _current
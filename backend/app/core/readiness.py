@@ -0,0 +1,56 @@
+import time
+import asyncio
+from typing import Dict, Any
+
+from app.core import database, catalog, cache, rankings
+
+# Startup steps that must finish before the worker reports ready
+COMPONENTS = ("database", "catalog", "cache", "rankings", "catalog_index")
+
+_done: Dict[str, bool] = {name: False for name in COMPONENTS}
+_started = time.monotonic()
+
+def mark_ready(name: str):
+    _done[name] = True
+
+def is_ready() -> bool:
+    return all(_done.values())
+
+def status() -> Dict[str, Any]:
+    return {
+        "ready": is_ready(),
+        "uptime": round(time.monotonic() - _started, 1),
+        "components": dict(_done),
+    }
+
+async def _step(name: str, func, *args):
+    """Run a blocking startup step in a worker thread and record it as done."""
+    await asyncio.to_thread(func, *args)
+    mark_ready(name)
+
+async def _open_cache():
+    await cache.init_cache()
+    mark_ready("cache")
+
+async def open_resources():
+    """Schema setup and the Redis pool, opened concurrently."""
+    # The catalog schema lives in the same SQLite file, so it waits for the core tables
+    async def schema():
+        await _step("database", database.init_database)
+        await _step("catalog", catalog.init_catalog)
+    await asyncio.gather(schema(), _open_cache())
+
+async def warm_up():
+    """
+    Load heavy data in the background: the hardware rankings (compiled tables
+    and trigram index) and the catalog's FTS index pages. Failures are logged
+    and leave the worker not ready.
+    """
+    steps = (
+        _step("rankings", rankings.reload_rankings),
+        _step("catalog_index", catalog.warm_catalog),
+    )
+    for name, result in zip(("rankings", "catalog_index"), await asyncio.gather(*steps, return_exceptions=True)):
+        if isinstance(result, Exception):
+            print(f"Warm-up of {name} failed: {result}")
+    print(f"Warm-up finished in {time.monotonic() - _started:.2f}s: {status()['components']}")
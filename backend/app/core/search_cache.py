@@ -0,0 +1,174 @@
+import re
+import json
+import time
+import heapq
+import asyncio
+from collections import OrderedDict
+from typing import Optional, List, Dict, Tuple, Any
+
+from app.core import catalog, http_cache
+from app.core.config import settings
+
+# Queries whose results may be derived from a shorter cached prefix
+_DERIVABLE_RE = re.compile(r"[a-z0-9]+")
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitters sketch: approximate counts for the most
+    frequent items of a stream using at most `capacity` counters. A new item
+    evicts one of the smallest counters and inherits its count (its
+    overestimate). Items are grouped in buckets by count (the stream-summary
+    structure), so every update is O(1).
+    """
+    __slots__ = ("capacity", "counts", "_buckets", "_min")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        # count -> items with that count (dicts used as insertion-ordered sets)
+        self._buckets: Dict[int, Dict[str, None]] = {}
+        self._min = 0
+
+    def _move(self, item: str, count: int):
+        """Move an item from bucket `count` to bucket `count + 1`."""
+        bucket = self._buckets[count]
+        del bucket[item]
+        if not bucket:
+            del self._buckets[count]
+            if self._min == count:
+                self._min = count + 1
+        self.counts[item] = count + 1
+        self._buckets.setdefault(count + 1, {})[item] = None
+
+    def add(self, item: str):
+        count = self.counts.get(item)
+        if count is not None:
+            self._move(item, count)
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = 1
+            self._buckets.setdefault(1, {})[item] = None
+            self._min = 1
+        else:
+            # The new item takes over the oldest of the smallest counters
+            victim = next(iter(self._buckets[self._min]))
+            del self.counts[victim]
+            self.counts[item] = self._min
+            bucket = self._buckets[self._min]
+            del bucket[victim]
+            bucket[item] = None
+            self._move(item, self._min)
+
+    def top(self, n: int) -> List[Tuple[str, int]]:
+        return heapq.nlargest(n, self.counts.items(), key=lambda kv: kv[1])
+
+    def decay(self):
+        """Halve every count so that popularity follows recent traffic."""
+        self.counts = {k: v // 2 for k, v in self.counts.items() if v > 1}
+        self._buckets = {}
+        for item, count in self.counts.items():
+            self._buckets.setdefault(count, {})[item] = None
+        self._min = min(self._buckets, default=0)
+
+class PrefixEntry:
+    """Deep match list of a popular prefix. `complete` when it holds every match."""
+    __slots__ = ("matches", "complete", "expires")
+
+    def __init__(self, matches: List[Dict[str, Any]], complete: bool, expires: float):
+        self.matches = matches
+        self.complete = complete
+        self.expires = expires
+
+# normalized query -> (expires, serialized body, ETag)
+_results: "OrderedDict[str, Tuple[float, str, str]]" = OrderedDict()
+_prefixes: Dict[str, PrefixEntry] = {}
+_sketch = SpaceSaving(settings.SEARCH_SKETCH_CAPACITY)
+
+def normalize(query: str) -> str:
+    """Cache key of a query: its lowercase word tokens joined by single spaces."""
+    return " ".join(catalog.tokenize(query))
+
+def record(normalized: str):
+    """Count one occurrence of a query in the popularity sketch."""
+    _sketch.add(normalized)
+
+def _derive(normalized: str, limit: int) -> Optional[List[Dict[str, Any]]]:
+    """
+    Catalog results of a query taken from the deep list of a warm prefix.
+    A longer query only matches a subset of its prefix's games, in the same
+    order, so a complete list can be filtered. Only used when it yields
+    `limit` games: with fewer, the search would also run its fuzzy step.
+    """
+    now = time.monotonic()
+    tokens = normalized.split(" ")
+    derivable = all(_DERIVABLE_RE.fullmatch(t) for t in tokens)
+    for end in range(len(normalized), 0, -1):
+        entry = _prefixes.get(normalized[:end])
+        if entry is None or entry.expires < now:
+            continue
+        if end == len(normalized):
+            if len(entry.matches) >= limit:
+                return entry.matches[:limit]
+        elif entry.complete and derivable:
+            found = []
+            for game in entry.matches:
+                if catalog.name_matches(game["name"], tokens):
+                    found.append(game)
+                    if len(found) == limit:
+                        return found
+        # A complete prefix list is the best evidence there is; shorter ones add nothing
+        if entry.complete:
+            return None
+    return None
+
+def render(suggestions: List[Dict[str, Any]]) -> Tuple[str, str]:
+    """Serialized /search body and its ETag."""
+    body = json.dumps({"results": suggestions})
+    return body, http_cache.make_etag(body)
+
+def get(normalized: str, limit: int = 5) -> Optional[Tuple[str, str]]:
+    """(body, ETag) cached or derived for a normalized query, None on miss."""
+    cached = _results.get(normalized)
+    if cached:
+        if cached[0] >= time.monotonic():
+            _results.move_to_end(normalized)
+            return cached[1], cached[2]
+        del _results[normalized]
+    derived = _derive(normalized, limit)
+    return put(normalized, derived) if derived is not None else None
+
+def put(normalized: str, suggestions: List[Dict[str, Any]]) -> Tuple[str, str]:
+    """
+    Cache the suggestions served for a normalized query for SEARCH_CACHE_TTL
+    seconds, serialized and hashed once. Returns (body, ETag).
+    """
+    body, etag = render(suggestions)
+    _results[normalized] = (time.monotonic() + settings.SEARCH_CACHE_TTL, body, etag)
+    _results.move_to_end(normalized)
+    while len(_results) > settings.SEARCH_CACHE_SIZE:
+        _results.popitem(last=False)
+    return body, etag
+
+def _load_prefixes(prefixes: List[str]) -> Dict[str, PrefixEntry]:
+    depth = settings.SEARCH_PREFIX_DEPTH
+    expires = time.monotonic() + 2 * settings.SEARCH_WARM_INTERVAL
+    entries = {}
+    for prefix in prefixes:
+        matches = catalog.prefix_matches(prefix, depth)
+        entries[prefix] = PrefixEntry(matches, len(matches) < depth, expires)
+    return entries
+
+async def warm_prefixes():
+    """Rebuild the deep match lists of the SEARCH_WARM_TOP most popular queries."""
+    global _prefixes
+    top = [prefix for prefix, _ in _sketch.top(settings.SEARCH_WARM_TOP) if prefix]
+    _sketch.decay()
+    _prefixes = await asyncio.to_thread(_load_prefixes, top)
+
+async def keep_warm():
+    """Background loop running warm_prefixes every SEARCH_WARM_INTERVAL seconds."""
+    while True:
+        await asyncio.sleep(settings.SEARCH_WARM_INTERVAL)
+        try:
+            await warm_prefixes()
+        except Exception as e:
+            print(f"Search prefix warm-up failed: {e}")
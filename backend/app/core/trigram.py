@@ -0,0 +1,71 @@
+import re
+import heapq
+from typing import Optional, List, Dict, Tuple, Iterable, FrozenSet
+
+# Memory/clock sizes and filler words that don't identify a model
+_NOISE_RE = re.compile(
+    r"\d+(?:\.\d+)?\s*(?:gb|mb|tb|ghz|mhz)\b|\b(?:or|better|equivalent|higher|above|series|vram|ram|with)\b"
+)
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_DIGITS_RE = re.compile(r"\d+")
+
+# Keys scored per query: the ones sharing the most trigrams with it
+MAX_CANDIDATES = 8
+
+def squash(text: str) -> str:
+    """Lowercase, drop size/clock noise and remove separators ("GTX-970 4GB" -> "gtx970")."""
+    text = _NOISE_RE.sub(" ", text.lower())
+    return _NON_ALNUM_RE.sub("", text)
+
+def trigrams(squashed: str) -> FrozenSet[str]:
+    padded = f"  {squashed} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+def model_number(text: str) -> Optional[str]:
+    """Longest digit run of a name, e.g. "4460" for "i5-4460"."""
+    runs = _DIGITS_RE.findall(text)
+    return max(runs, key=len) if runs else None
+
+class TrigramIndex:
+    """
+    Character-trigram inverted index for fuzzy name lookup.
+
+    A query is only matched to keys whose model number appears as a whole
+    digit run in the query, so "gtx 1060" never resolves to "gtx 1070".
+    """
+    __slots__ = ("_grams", "_numbers", "_postings")
+
+    def __init__(self, keys: Iterable[str]):
+        self._grams: List[FrozenSet[str]] = []
+        self._numbers: List[Optional[str]] = []
+        self._postings: Dict[str, List[int]] = {}
+        for i, key in enumerate(keys):
+            grams = trigrams(squash(key))
+            self._grams.append(grams)
+            self._numbers.append(model_number(key))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(i)
+
+    def search(self, text: str) -> Optional[Tuple[int, float]]:
+        """Best matching key position and its Dice similarity (0..1), or None."""
+        query = trigrams(squash(text))
+        counts: Dict[int, int] = {}
+        for gram in query:
+            for i in self._postings.get(gram, ()):
+                counts[i] = counts.get(i, 0) + 1
+        if not counts:
+            return None
+
+        digit_runs = set(_DIGITS_RE.findall(text))
+        candidates = heapq.nlargest(
+            MAX_CANDIDATES,
+            ((shared, i) for i, shared in counts.items()
+             if not self._numbers[i] or self._numbers[i] in digit_runs)
+        )
+
+        best = None
+        for shared, i in candidates:
+            similarity = 2 * shared / (len(query) + len(self._grams[i]))
+            if best is None or similarity > best[1]:
+                best = (i, similarity)
+        return best
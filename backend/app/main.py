@@ -1,17 +1,44 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.api import endpoints
-from app.core import database
+from app.core import cache, rankings, readiness, search_cache
+from app.core.admission import AdmissionMiddleware, AdmissionLimiter
+from app.services import compat_service
 
-app = FastAPI(title="GameSphere Analytics API")
+async def warm_up():
+    await readiness.warm_up()
+    # Bring stored requirement scores up to the loaded ranking version
+    compat_service.schedule_score_refresh()
 
-# Initialize database on startup
-@app.on_event("startup")
-async def startup_event():
-    database.init_database()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open the database schema and the Redis pool concurrently, then start
+    # serving while the heavy data loads in the background (see /health/ready)
+    await readiness.open_resources()
+    # Stored requirement scores follow the ranking data: re-score when it changes
+    rankings.add_reload_listener(compat_service.schedule_score_refresh)
+    warm_task = asyncio.create_task(warm_up())
+    search_task = asyncio.create_task(search_cache.keep_warm())
+    yield
+    warm_task.cancel()
+    search_task.cancel()
+    await cache.close_cache()
+
+app = FastAPI(title="GameSphere Analytics API", lifespan=lifespan)
 
-# CORS configuration
 from app.core.config import settings
+
+# Admission control, added before CORS so that shed responses still get CORS headers
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(
+        AdmissionMiddleware,
+        limiters=[AdmissionLimiter(retry_after=settings.ADMISSION_RETRY_AFTER, **c) for c in settings.ADMISSION_CLASSES]
+    )
+
+# CORS configuration
 origins = settings.ALLOWED_ORIGINS
 
 app.add_middleware(
@@ -27,3 +54,14 @@ app.include_router(endpoints.router, prefix="/api")
 @app.get("/")
 def read_root():
     return {"message": "Welcome to GameSphere Analytics API"}
+
+@app.get("/health/live")
+def health_live():
+    """Liveness: the process is up and serving requests."""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+def health_ready():
+    """Readiness: resources are open and warm data is loaded. 503 until then."""
+    status = readiness.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
@@ -54,22 +54,47 @@ class FavoriteGame(BaseModel):
     game_image: Optional[str] = None
     game_rating: Optional[float] = None
 
+class FavoriteCompatibility(BaseModel):
+    rig_id: int
+    can_run_minimum: bool
+    can_run_recommended: bool
+
 class FavoriteResponse(BaseModel):
     game_id: int
     game_name: str
     game_image: Optional[str] = None
     game_rating: Optional[float] = None
     created_at: str
+    compatibility: Optional[FavoriteCompatibility] = None
+
+# Rig profile schemas
+class RigProfile(BaseModel):
+    name: str
+    cpu: str
+    gpu: str
+    ram: str
+    is_default: bool = False
+
+class RigProfileResponse(BaseModel):
+    id: int
+    name: str
+    cpu: str
+    gpu: str
+    ram: str
+    is_default: bool
+    updated_at: str
 
-# Comparison schemas
+# Comparison schemas (send either the specs or the id of a saved rig)
 class CompareRequest(BaseModel):
     game_id: int
-    user_cpu: str
-    user_gpu: str
-    user_ram: str
+    user_cpu: Optional[str] = None
+    user_gpu: Optional[str] = None
+    user_ram: Optional[str] = None
+    rig_id: Optional[int] = None
 
 class CompareResponse(BaseModel):
     can_run_minimum: bool
     can_run_recommended: bool
     details: dict
+    ranking_version: Optional[str] = None
 
@@ -0,0 +1,159 @@
+import sys
+import json
+import asyncio
+from typing import Optional, List, Dict, Any, Tuple, Set
+
+from app.core import catalog, database
+from app.core.config import settings
+from app.core.parser import parse_requirements, extract_pc_requirements
+from app.services.rawg_service import rawg_service
+from app.services.game_service import score_game
+
+SYNC_NAME = "rawg_games"
+
+async def _fetch_requirements(game: Dict[str, Any], semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    """Fetch a changed game's details and parse its PC requirements. RAWG errors are raised."""
+    async with semaphore:
+        game_data = await rawg_service.get_game(game["id"])
+
+    pc_requirements = extract_pc_requirements(game_data)
+    minimum = pc_requirements.get("minimum", "")
+    recommended = pc_requirements.get("recommended", "")
+    return {
+        "game_id": game["id"],
+        "minimum": minimum,
+        "recommended": recommended,
+        "parsed_min": parse_requirements(minimum).json(),
+        "parsed_rec": parse_requirements(recommended).json(),
+        "updated": game.get("updated"),
+    }
+
+async def _sync_requirements(games: List[Dict[str, Any]], semaphore: asyncio.Semaphore) -> List[int]:
+    """
+    Fetch, parse and store the requirements of games; only rows that actually
+    changed are re-scored. Games whose details can't be fetched are kept in
+    catalog_sync_failures and retried by later runs. Returns the failed ids.
+    """
+    results = await asyncio.gather(*(_fetch_requirements(g, semaphore) for g in games), return_exceptions=True)
+    requirements, failures = [], []
+    for game, result in zip(games, results):
+        if isinstance(result, Exception):
+            print(f"Sync: failed to fetch details for game {game['id']}: {result}")
+            failures.append({"game_id": game["id"], "updated": game.get("updated"), "error": str(result)})
+        else:
+            requirements.append(result)
+
+    written = set(catalog.upsert_requirements(requirements))
+    # Re-score changed requirements so stored scores never lag behind their text
+    database.save_game_requirements([
+        score_game(r["game_id"], json.loads(r["parsed_min"]), json.loads(r["parsed_rec"]))
+        for r in requirements if r["game_id"] in written
+    ])
+    catalog.clear_sync_failures(SYNC_NAME, [r["game_id"] for r in requirements])
+    if failures:
+        catalog.add_sync_failures(SYNC_NAME, failures)
+    return [f["game_id"] for f in failures]
+
+async def sync_page(games: List[Dict[str, Any]], semaphore: asyncio.Semaphore) -> Tuple[int, int]:
+    """Re-parse and upsert one page of changed games. Returns (games written, detail fetches failed)."""
+    written = catalog.upsert_games(games)
+    return written, len(await _sync_requirements(games, semaphore))
+
+async def retry_failures(semaphore: asyncio.Semaphore) -> Tuple[int, int]:
+    """
+    Retry games whose details failed in earlier runs. Games failing their last
+    allowed attempt are logged and dropped. Returns (retried, failed again).
+    """
+    max_attempts = settings.CATALOG_SYNC_MAX_ATTEMPTS
+    pending = catalog.get_sync_failures(SYNC_NAME, settings.CATALOG_SYNC_RETRY_BATCH, max_attempts)
+    if not pending:
+        return 0, 0
+    games = [{"id": f["game_id"], "updated": f["updated"]} for f in pending]
+    failed = set(await _sync_requirements(games, semaphore))
+
+    given_up = [f["game_id"] for f in pending if f["game_id"] in failed and f["attempts"] + 1 >= max_attempts]
+    if given_up:
+        print(f"Sync: giving up on details of games {given_up} after {max_attempts} attempts")
+        catalog.clear_sync_failures(SYNC_NAME, given_up)
+    return len(games), len(failed)
+
+def _is_new(game: Dict[str, Any], high_water: Optional[str], synced_at_mark: Set[int]) -> bool:
+    """Updated after the mark, or at the mark but not synced yet (ties broken by id)."""
+    updated = game.get("updated") or ""
+    if not high_water or updated > high_water:
+        return True
+    return updated == high_water and game["id"] not in synced_at_mark
+
+async def run_sync(max_pages: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Page through RAWG ordered by -updated and sync every game changed since the
+    last completed run (the high-water mark).
+
+    Progress is checkpointed after each page, so a crashed or page-limited run
+    resumes where it stopped. The high-water mark only advances once a run
+    reaches games it already has; games updated while a run is in progress
+    are newer than the run's mark and are picked up by the next run. The ids
+    synced at the mark's timestamp are kept with it, so games sharing that
+    timestamp are synced exactly once. Games whose details failed are retried
+    at the start of the next runs.
+    """
+    max_pages = max_pages or settings.CATALOG_SYNC_MAX_PAGES
+    semaphore = asyncio.Semaphore(settings.CATALOG_SYNC_CONCURRENCY)
+
+    state = catalog.get_sync_state(SYNC_NAME)
+    high_water = state["high_water"]
+    run_high_water = state["run_high_water"]
+    synced_at_mark = set(state["high_water_ids"])
+    run_ids = set(state["run_high_water_ids"])
+    page = state["next_page"] or 1
+    if state["next_page"]:
+        print(f"Sync: resuming at page {page}")
+
+    stats = {"pages": 0, "changed": 0, "written": 0, "failed": 0, "complete": False}
+    stats["retried"], stats["retry_failed"] = await retry_failures(semaphore)
+    while stats["pages"] < max_pages:
+        data = await rawg_service.list_games(
+            ordering="-updated",
+            page=page,
+            page_size=settings.CATALOG_SYNC_PAGE_SIZE
+        )
+        results = [g for g in data.get("results", []) if g.get("id")]
+        if results and run_high_water is None:
+            run_high_water = results[0].get("updated")
+        run_ids.update(g["id"] for g in results if run_high_water and g.get("updated") == run_high_water)
+
+        changed = [g for g in results if _is_new(g, high_water, synced_at_mark)]
+        if changed:
+            written, failed = await sync_page(changed, semaphore)
+            stats["written"] += written
+            stats["failed"] += failed
+        stats["changed"] += len(changed)
+        stats["pages"] += 1
+
+        if len(changed) < len(results) or not data.get("next"):
+            stats["complete"] = True
+            break
+
+        page += 1
+        catalog.save_sync_state(SYNC_NAME, high_water, run_high_water, page, synced_at_mark, run_ids)
+
+    if stats["complete"]:
+        if run_high_water and (not high_water or run_high_water > high_water):
+            new_high_water, new_ids = run_high_water, run_ids
+        elif run_high_water == high_water:
+            new_high_water, new_ids = high_water, synced_at_mark | run_ids
+        else:
+            new_high_water, new_ids = high_water, synced_at_mark
+        catalog.save_sync_state(SYNC_NAME, new_high_water, None, None, new_ids)
+        stats["high_water"] = new_high_water
+    else:
+        stats["high_water"] = high_water
+        print(f"Sync: stopped after {max_pages} pages, next run resumes at page {page}")
+
+    return stats
+
+if __name__ == "__main__":
+    database.init_database()
+    catalog.init_catalog()
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    print(f"Sync finished: {asyncio.run(run_sync(pages))}")
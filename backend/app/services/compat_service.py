@@ -0,0 +1,239 @@
+import json
+import asyncio
+import threading
+from typing import Optional, List, Dict, Any, Tuple
+
+from app.core import catalog, comparator, database
+from app.core.config import settings
+from app.core.rankings import get_rankings
+from app.services import game_service
+from app.services.game_service import score_game
+
+async def get_game_requirements(game_id: int) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Parsed (minimum, recommended) requirements of a game. Served from the catalog
+    when synced; otherwise fetched from RAWG once and stored. RAWG errors are raised.
+    """
+    stored = catalog.get_requirements(game_id)
+    if stored:
+        return stored["parsed_min"], stored["parsed_rec"]
+
+    # fetch_game_data stores the requirements; if that failed, store them here so errors surface
+    game_data = await game_service.fetch_game_data(game_id)
+    stored = catalog.get_requirements(game_id)
+    if stored:
+        return stored["parsed_min"], stored["parsed_rec"]
+    return game_service.store_requirements(game_data)
+
+async def get_requirement_scores(game_id: int) -> Dict[str, Any]:
+    """
+    Resolved requirement scores of a game for the current ranking version.
+    Computed and stored on first use; RAWG errors are raised.
+    """
+    rankings = get_rankings()
+    stored = database.get_game_requirements([game_id], rankings.version).get(game_id)
+    if stored:
+        return stored
+
+    parsed_min, parsed_rec = await get_game_requirements(game_id)
+    scores = score_game(game_id, parsed_min, parsed_rec, rankings)
+    database.save_game_requirements([scores])
+    return scores
+
+# Bulk refreshes run one at a time
+_refresh_lock = threading.Lock()
+
+def refresh_requirement_scores(batch_size: int = 500) -> int:
+    """
+    Re-score every stored requirement set for the current ranking version, in
+    batches, then drop rows of older versions. Returns the number of games scored.
+    """
+    with _refresh_lock:
+        return _refresh_requirement_scores(batch_size)
+
+def _refresh_requirement_scores(batch_size: int) -> int:
+    rankings = get_rankings()
+    scored = 0
+    while True:
+        pending = database.get_requirements_to_score(rankings.version, batch_size)
+        if not pending:
+            break
+        database.save_game_requirements([
+            score_game(row["game_id"], json.loads(row["parsed_min"]), json.loads(row["parsed_rec"]), rankings)
+            for row in pending
+        ])
+        scored += len(pending)
+    # A newer version may have been loaded meanwhile; its own refresh cleans up
+    if get_rankings().version != rankings.version:
+        print(f"Requirement scores for rankings {rankings.version}: superseded, old rows kept")
+        return scored
+    deleted = database.delete_game_requirements_except(rankings.version)
+    print(f"Requirement scores for rankings {rankings.version}: {scored} games scored, {deleted} old rows removed")
+    return scored
+
+def schedule_score_refresh(rankings=None):
+    """
+    Run refresh_requirement_scores in a background thread (used as a rankings
+    reload listener). Overlapping refreshes wait for each other.
+    """
+    threading.Thread(target=refresh_requirement_scores, name="requirement-scores", daemon=True).start()
+
+def check_rig(rig: Dict[str, Any], scores: Dict[str, Any]) -> comparator.CompareResult:
+    """Compare a rig profile against a game's requirement scores (flags only, no details)."""
+    return comparator.check_scores(*rig_scores(rig), scores)
+
+def rig_scores(rig: Dict[str, Any]) -> Tuple[int, int, int]:
+    """(cpu score, gpu score, RAM in GB) of a rig profile."""
+    return comparator.user_scores(rig["cpu"], rig["gpu"], rig["ram"])
+
+def local_requirement_scores(game_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    Requirement scores of the games that are known locally (stored scores, or
+    catalog requirements scored now), by game id. Never calls RAWG.
+    """
+    rankings = get_rankings()
+    scores = database.get_game_requirements(game_ids, rankings.version)
+    computed = []
+    for game_id in game_ids:
+        if game_id in scores:
+            continue
+        stored = catalog.get_requirements(game_id)
+        if stored:
+            scores[game_id] = score_game(game_id, stored["parsed_min"], stored["parsed_rec"], rankings)
+            computed.append(scores[game_id])
+    database.save_game_requirements(computed)
+    return scores
+
+async def refresh_compatibility(user_id: int, rigs: List[Dict[str, Any]], game_ids: List[int], fetch: bool = True):
+    """
+    Compute and store compatibility for every (rig, game) pair; each rig is
+    checked against all games at once in SQL. With `fetch`, requirements
+    missing locally are loaded from RAWG with bounded concurrency, and games
+    that fail get a failure marker (retried after COMPAT_RETRY_INTERVAL).
+    Without it, games not known locally are skipped.
+    """
+    if not rigs or not game_ids:
+        return
+
+    version = get_rankings().version
+    available = list(local_requirement_scores(game_ids))
+    failed = []
+    if fetch:
+        semaphore = asyncio.Semaphore(settings.RAWG_MAX_CONCURRENCY)
+
+        async def load(game_id: int) -> bool:
+            async with semaphore:
+                try:
+                    await get_requirement_scores(game_id)
+                    return True
+                except Exception as e:
+                    print(f"Failed to load requirements for game {game_id}: {e}")
+                    return False
+
+        missing = [g for g in game_ids if g not in available]
+        for game_id, ok in zip(missing, await asyncio.gather(*(load(g) for g in missing))):
+            (available if ok else failed).append(game_id)
+
+    rows = []
+    for rig in rigs:
+        cpu_score, gpu_score, ram_gb = rig_scores(rig)
+        minimum = set(database.filter_runnable_games(version, cpu_score, gpu_score, ram_gb, False, available))
+        recommended = set(database.filter_runnable_games(version, cpu_score, gpu_score, ram_gb, True, available))
+        for game_id in available:
+            rows.append({
+                "rig_id": rig["id"],
+                "game_id": game_id,
+                "user_id": user_id,
+                "ranking_version": version,
+                "can_run_minimum": int(game_id in minimum),
+                "can_run_recommended": int(game_id in recommended),
+            })
+        for game_id in failed:
+            rows.append({
+                "rig_id": rig["id"],
+                "game_id": game_id,
+                "user_id": user_id,
+                "ranking_version": version,
+                "can_run_minimum": 0,
+                "can_run_recommended": 0,
+                "failed": True,
+            })
+    database.save_compatibility(rows)
+
+# (rig_id, game_id) pairs with a background refresh in progress
+_in_flight = set()
+
+async def refresh_in_background(user_id: int, rig: Dict[str, Any], game_ids: List[int]):
+    """Background refresh of games a read couldn't compute locally, skipping pairs already being refreshed."""
+    pending = [g for g in game_ids if (rig["id"], g) not in _in_flight]
+    if not pending:
+        return
+    _in_flight.update((rig["id"], g) for g in pending)
+    try:
+        await refresh_compatibility(user_id, [rig], pending)
+    finally:
+        _in_flight.difference_update((rig["id"], g) for g in pending)
+
+async def refresh_for_favorite(user_id: int, game_id: int):
+    """A game was favorited: compute it against all of the user's rigs."""
+    await refresh_compatibility(user_id, database.get_user_rigs(user_id), [game_id])
+
+async def refresh_for_rig(user_id: int, rig_id: int):
+    """A rig was created or changed: compute it against all of the user's favorites."""
+    rig = database.get_rig_profile(user_id, rig_id)
+    if rig:
+        favorites = database.get_user_favorites(user_id)
+        await refresh_compatibility(user_id, [rig], [f["game_id"] for f in favorites])
+
+def _needs_refresh(favorite: Dict[str, Any], version: str) -> bool:
+    """Missing or computed with older ranking data; failure markers only once their retry is due."""
+    if favorite["failed"]:
+        return bool(favorite["retry_due"])
+    return favorite["ranking_version"] != version
+
+def due_retries(user_id: int, rig_id: Optional[int] = None) -> Tuple[Optional[Dict[str, Any]], List[int]]:
+    """
+    (rig, favorite game ids whose failure marker is due for a retry), without
+    reading the favorites list. Lets a 304 still schedule those retries.
+    """
+    rig = database.get_rig_profile(user_id, rig_id)
+    if not rig:
+        return None, []
+    return rig, database.get_due_compatibility_retries(user_id, rig["id"], settings.COMPAT_RETRY_INTERVAL)
+
+async def get_favorites_with_compatibility(
+    user_id: int, rig_id: Optional[int] = None
+) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]], List[int]]:
+    """
+    Favorites with stored compatibility for a rig (the default one if rig_id is None).
+    Missing or stale rows are recomputed inline only from local data; returns
+    (favorites, rig, game ids left for refresh_in_background). Games without
+    a usable row get no "compatibility" entry.
+    """
+    rig = database.get_rig_profile(user_id, rig_id)
+    if not rig:
+        return database.get_user_favorites(user_id), None, []
+
+    version = get_rankings().version
+    retry_after = settings.COMPAT_RETRY_INTERVAL
+    favorites = database.get_favorites_with_compatibility(user_id, rig["id"], retry_after)
+    stale = [f["game_id"] for f in favorites if _needs_refresh(f, version)]
+    pending = []
+    if stale:
+        await refresh_compatibility(user_id, [rig], stale, fetch=False)
+        favorites = database.get_favorites_with_compatibility(user_id, rig["id"], retry_after)
+        pending = [f["game_id"] for f in favorites if _needs_refresh(f, version)]
+
+    for favorite in favorites:
+        computed = favorite.pop("ranking_version") == version and not favorite["failed"]
+        can_run_minimum = favorite.pop("can_run_minimum")
+        can_run_recommended = favorite.pop("can_run_recommended")
+        favorite.pop("failed")
+        favorite.pop("retry_due")
+        if computed:
+            favorite["compatibility"] = {
+                "rig_id": rig["id"],
+                "can_run_minimum": bool(can_run_minimum),
+                "can_run_recommended": bool(can_run_recommended),
+            }
+    return favorites, rig, pending
@@ -0,0 +1,153 @@
+import json
+from typing import Optional, List, Dict, Any, Tuple
+
+from app.core import catalog, comparator, database
+from app.core.parser import parse_requirements, extract_pc_requirements
+from app.models.schemas import Game
+from app.services.rawg_service import rawg_service
+
+def similar_game_card(g: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce a RAWG game to the fields shown on a similar-game card."""
+    return {
+        "id": g.get("id"),
+        "name": g.get("name"),
+        "background_image": g.get("background_image"),
+        "rating": g.get("rating"),
+        "genres": g.get("genres", [])[:1]
+    }
+
+def build_game(game_data: Dict[str, Any]) -> Game:
+    """
+    Build a Game from a RAWG detail payload, with parsed requirements but without similar games.
+    """
+    pc_requirements = extract_pc_requirements(game_data)
+    print(f"PC requirements found: {bool(pc_requirements)}")
+    parsed_min = parse_requirements(pc_requirements.get("minimum", ""))
+    parsed_rec = parse_requirements(pc_requirements.get("recommended", ""))
+
+    return Game(
+        id=game_data["id"],
+        name=game_data["name"],
+        description_raw=game_data.get("description_raw"),
+        released=game_data.get("released"),
+        background_image=game_data.get("background_image"),
+        website=game_data.get("website"),
+        rating=game_data.get("rating"),
+        metacritic=game_data.get("metacritic"),
+        playtime=game_data.get("playtime"),
+        platforms=game_data.get("platforms"),
+        genres=game_data.get("genres"),
+        developers=game_data.get("developers"),
+        publishers=game_data.get("publishers"),
+        parsed_requirements_min=parsed_min,
+        parsed_requirements_rec=parsed_rec,
+        file_size=parsed_min.storage if parsed_min.storage else parsed_rec.storage,
+        similar_games=[]
+    )
+
+def score_game(game_id: int, parsed_min: Dict[str, Any], parsed_rec: Dict[str, Any], rankings=None) -> Dict[str, Any]:
+    """game_requirements row for parsed requirements, scored with the given (or current) rankings."""
+    scores = comparator.score_requirements(
+        min_cpu=parsed_min.get("cpu"),
+        min_gpu=parsed_min.get("gpu"),
+        min_ram=parsed_min.get("ram"),
+        rec_cpu=parsed_rec.get("cpu"),
+        rec_gpu=parsed_rec.get("gpu"),
+        rec_ram=parsed_rec.get("ram"),
+        rankings=rankings
+    )
+    scores["game_id"] = game_id
+    return scores
+
+def store_requirements(game_data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Parse the PC requirements of a RAWG detail payload and keep them in the
+    catalog; when they changed, their scores are stored too. Returns the
+    parsed (minimum, recommended) requirements.
+    """
+    pc_requirements = extract_pc_requirements(game_data)
+    minimum = pc_requirements.get("minimum", "")
+    recommended = pc_requirements.get("recommended", "")
+    parsed_min = parse_requirements(minimum).dict()
+    parsed_rec = parse_requirements(recommended).dict()
+    written = catalog.upsert_requirements([{
+        "game_id": game_data["id"],
+        "minimum": minimum,
+        "recommended": recommended,
+        "parsed_min": json.dumps(parsed_min),
+        "parsed_rec": json.dumps(parsed_rec),
+        "updated": game_data.get("updated"),
+    }])
+    if written:
+        database.save_game_requirements([score_game(game_data["id"], parsed_min, parsed_rec)])
+    return parsed_min, parsed_rec
+
+async def find_game_slug(game_name: str) -> Optional[str]:
+    """Search RAWG for a game name and return the slug of the best match."""
+    data = await rawg_service.list_games(search=game_name, page_size=1)
+    print(f"Search response received, results count: {len(data.get('results', []))}")
+    if not data.get("results"):
+        return None
+    return data["results"][0]["slug"]
+
+async def fetch_game_data(id_or_slug: Any) -> Dict[str, Any]:
+    """
+    Fetch a game's RAWG detail payload and keep it, with its requirements and
+    their scores, in the local catalog so that /compare needn't fetch it again.
+    """
+    game_data = await rawg_service.get_game(id_or_slug, language="por")
+    print(f"Game details received for: {game_data.get('name')}")
+    try:
+        catalog.upsert_games([game_data])
+        store_requirements(game_data)
+    except Exception as e:
+        print(f"Catalog ingestion failed: {e}")
+    return game_data
+
+async def fetch_similar_games(game_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Similar games from RAWG's suggested endpoint, falling back to well-rated
+    games of the same genres. Failures are logged and give an empty list.
+    """
+    try:
+        suggested_data = await rawg_service.get_suggested(game_data["id"], page_size=2)
+        results = suggested_data.get("results", [])
+        print(f"Similar games from suggested endpoint: {len(results)}")
+        if results:
+            return [similar_game_card(g) for g in results[:2]]
+    except Exception as e:
+        print(f"Exception fetching suggested games: {e}")
+
+    # Fallback: search by genre
+    genre_ids = [str(g.get("id")) for g in game_data.get("genres") or []]
+    if not genre_ids:
+        return []
+
+    print("Suggested endpoint empty, trying genre-based search...")
+    try:
+        search_data = await rawg_service.list_games(
+            genres=",".join(genre_ids[:3]),  # Use up to 3 genres for better matching
+            page_size=10,  # Get more to filter better
+            ordering="-rating",
+            metacritic="70,100"  # Only well-rated games
+        )
+    except Exception as e:
+        print(f"Exception fetching similar games: {e}")
+        return []
+
+    # Filter out the current game and games without images
+    similar = [
+        g for g in search_data.get("results", [])
+        if g.get("id") != game_data["id"]
+        and g.get("background_image")
+        and (g.get("rating") or 0) > 3.5  # Only games with decent ratings
+    ][:2]
+    print(f"Similar games fetched from genre search: {len(similar)}")
+    return [similar_game_card(g) for g in similar]
+
+async def fetch_game(id_or_slug: Any) -> Game:
+    """Fetch a game by RAWG id or slug with parsed requirements and similar games."""
+    game_data = await fetch_game_data(id_or_slug)
+    game_obj = build_game(game_data)
+    game_obj.similar_games = await fetch_similar_games(game_data)
+    return game_obj
@@ -35,4 +35,41 @@ class RawgService:
                 print(f"Unexpected error: {e}")
                 return {"results": []}
 
+    async def list_games(self, **params) -> Dict[str, Any]:
+        """
+        Fetch one page of the RAWG game list (e.g. ordering="-updated", page=3).
+        Unlike search_games, errors are raised so callers can retry or resume.
+        """
+        async with httpx.AsyncClient() as client:
+            response = await client.get(
+                f"{self.BASE_URL}/games",
+                params={"key": self.api_key, **params}
+            )
+            response.raise_for_status()
+            return response.json()
+
+    async def get_game(self, id_or_slug: Any, **params) -> Dict[str, Any]:
+        """
+        Fetch the full detail payload of a game by RAWG id or slug. Errors are raised.
+        """
+        async with httpx.AsyncClient() as client:
+            response = await client.get(
+                f"{self.BASE_URL}/games/{id_or_slug}",
+                params={"key": self.api_key, **params}
+            )
+            response.raise_for_status()
+            return response.json()
+
+    async def get_suggested(self, game_id: int, page_size: int = 2) -> Dict[str, Any]:
+        """
+        Fetch RAWG's suggested (similar) games for a game. Errors are raised.
+        """
+        async with httpx.AsyncClient() as client:
+            response = await client.get(
+                f"{self.BASE_URL}/games/{game_id}/suggested",
+                params={"key": self.api_key, "page_size": page_size}
+            )
+            response.raise_for_status()
+            return response.json()
+
 rawg_service = RawgService()